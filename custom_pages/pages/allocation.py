@@ -13,6 +13,14 @@ def show_allocation_page(portfolio):
     # Get fund data
     fund_data = get_fund_data()
     
+    # Ticker -> attribute dicts so labels and table cells are plain dict lookups
+    fund_index = fund_data.set_index('Ticker')
+    fund_names = fund_index['Fund Name'].to_dict()
+    expense_ratios = fund_index['Expense Ratio'].to_dict()
+    
+    def format_fund(ticker):
+        return f"{ticker} - {fund_names[ticker]} ({expense_ratios[ticker]:.3%})"
+    
     # Create columns for layout
     col1, col2 = st.columns([1, 1])
     
@@ -121,35 +129,35 @@ def show_allocation_page(portfolio):
         
         # US Stock Fund Selection
         us_stock_options = fund_data[fund_data['Category'].isin(['US Total Market', 'US Large Cap'])]
+        us_stock_tickers = us_stock_options['Ticker'].tolist()
         us_fund = st.selectbox(
             "US Stock Fund",
-            options=us_stock_options['Ticker'].tolist(),
-            index=us_stock_options['Ticker'].tolist().index(portfolio.us_stock_fund) 
-                if portfolio.us_stock_fund in us_stock_options['Ticker'].tolist() else 0,
-            format_func=lambda x: f"{x} - {us_stock_options[us_stock_options['Ticker'] == x]['Fund Name'].values[0]} " +
-                                f"({us_stock_options[us_stock_options['Ticker'] == x]['Expense Ratio'].values[0]:.3%})"
+            options=us_stock_tickers,
+            index=us_stock_tickers.index(portfolio.us_stock_fund) 
+                if portfolio.us_stock_fund in us_stock_tickers else 0,
+            format_func=format_fund
         )
         
         # International Stock Fund Selection
         intl_stock_options = fund_data[fund_data['Category'].isin(['International Developed', 'International Emerging'])]
+        intl_stock_tickers = intl_stock_options['Ticker'].tolist()
         intl_fund = st.selectbox(
             "International Stock Fund",
-            options=intl_stock_options['Ticker'].tolist(),
-            index=intl_stock_options['Ticker'].tolist().index(portfolio.international_stock_fund) 
-                if portfolio.international_stock_fund in intl_stock_options['Ticker'].tolist() else 0,
-            format_func=lambda x: f"{x} - {intl_stock_options[intl_stock_options['Ticker'] == x]['Fund Name'].values[0]} " +
-                                 f"({intl_stock_options[intl_stock_options['Ticker'] == x]['Expense Ratio'].values[0]:.3%})"
+            options=intl_stock_tickers,
+            index=intl_stock_tickers.index(portfolio.international_stock_fund) 
+                if portfolio.international_stock_fund in intl_stock_tickers else 0,
+            format_func=format_fund
         )
         
         # Bond Fund Selection
         bond_options = fund_data[fund_data['Category'].isin(['US Total Bond', 'US Treasury', 'US Corporate', 'US TIPS'])]
+        bond_tickers = bond_options['Ticker'].tolist()
         bond_fund = st.selectbox(
             "Bond Fund",
-            options=bond_options['Ticker'].tolist(),
-            index=bond_options['Ticker'].tolist().index(portfolio.bond_fund) 
-                if portfolio.bond_fund in bond_options['Ticker'].tolist() else 0,
-            format_func=lambda x: f"{x} - {bond_options[bond_options['Ticker'] == x]['Fund Name'].values[0]} " +
-                                f"({bond_options[bond_options['Ticker'] == x]['Expense Ratio'].values[0]:.3%})"
+            options=bond_tickers,
+            index=bond_tickers.index(portfolio.bond_fund) 
+                if portfolio.bond_fund in bond_tickers else 0,
+            format_func=format_fund
         )
         
         # Update portfolio if fund selection has changed
@@ -194,9 +202,9 @@ def show_allocation_page(portfolio):
             'Ticker': [portfolio.us_stock_fund, portfolio.international_stock_fund, portfolio.bond_fund],
             'Allocation': [f"{portfolio.us_stock_allocation}%", f"{portfolio.international_stock_allocation}%", f"{portfolio.bond_allocation}%"],
             'Expense Ratio': [
-                f"{fund_data[fund_data['Ticker'] == portfolio.us_stock_fund]['Expense Ratio'].values[0]:.3%}",
-                f"{fund_data[fund_data['Ticker'] == portfolio.international_stock_fund]['Expense Ratio'].values[0]:.3%}",
-                f"{fund_data[fund_data['Ticker'] == portfolio.bond_fund]['Expense Ratio'].values[0]:.3%}"
+                f"{expense_ratios[portfolio.us_stock_fund]:.3%}",
+                f"{expense_ratios[portfolio.international_stock_fund]:.3%}",
+                f"{expense_ratios[portfolio.bond_fund]:.3%}"
             ]
         })
         
@@ -1,9 +1,22 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 import plotly.express as px
-from utils.compound_calculator import calculate_portfolio_growth, calculate_fee_impact
+from utils.compound_calculator import calculate_portfolio_growth_from_scalars, calculate_fee_impact_from_scalars
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_portfolio_growth(*args):
+    """
+    Memoized portfolio growth projection keyed on the plain input values
+    """
+    return calculate_portfolio_growth_from_scalars(*args)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_fee_impact(*args):
+    """
+    Memoized fee impact comparison keyed on the plain input values
+    """
+    return calculate_fee_impact_from_scalars(*args)
 
 def show_compound_growth_page(portfolio):
     """
@@ -46,16 +59,20 @@ def show_compound_growth_page(portfolio):
         monthly_contribution != portfolio.monthly_contribution or
         years_to_grow != portfolio.years_to_grow):
         
+        # Capture the previous initial investment before it is overwritten
+        old_initial = portfolio.initial_investment
+        
         portfolio.initial_investment = initial_investment
         portfolio.monthly_contribution = monthly_contribution
         portfolio.years_to_grow = years_to_grow
         
         # Also update account values proportionally if initial investment changed
-        if initial_investment != portfolio.initial_investment:
-            total_accounts = sum(portfolio.account_values.values())
-            if total_accounts > 0:
-                ratio = initial_investment / total_accounts
-                portfolio.account_values = {k: v * ratio for k, v in portfolio.account_values.items()}
+        if initial_investment != old_initial and old_initial > 0:
+            ratio = initial_investment / old_initial
+            # Rebind a new dict, since saved snapshots may share the old one
+            portfolio.account_values = {
+                account: value * ratio for account, value in portfolio.account_values.items()
+            }
         
         st.success("Investment parameters updated!")
     
@@ -110,47 +127,48 @@ def show_compound_growth_page(portfolio):
     st.metric("Weighted Expected Annual Return", f"{weighted_return:.2f}%")
     
     # Calculate and project growth
-    growth_data = calculate_portfolio_growth(portfolio)
+    growth_data = _cached_portfolio_growth(
+        portfolio.initial_investment,
+        portfolio.monthly_contribution,
+        portfolio.years_to_grow,
+        portfolio.us_stock_allocation,
+        portfolio.international_stock_allocation,
+        portfolio.bond_allocation,
+        portfolio.expected_return_us,
+        portfolio.expected_return_intl,
+        portfolio.expected_return_bond
+    )
     
     # Growth visualization
     st.subheader("Growth Projections")
     
-    # Create line chart of growth
-    fig = go.Figure()
-    
-    # Add total growth line
-    fig.add_trace(go.Scatter(
-        x=growth_data['Year'],
-        y=growth_data['Total Balance'],
-        mode='lines',
-        name='Total Portfolio',
-        line=dict(color='rgb(31, 119, 180)', width=4)
-    ))
-    
-    # Add component lines
-    fig.add_trace(go.Scatter(
-        x=growth_data['Year'],
-        y=growth_data['US Stocks'],
-        mode='lines',
-        name='US Stocks',
-        line=dict(color='rgb(255, 127, 14)', width=2)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=growth_data['Year'],
-        y=growth_data['International Stocks'],
-        mode='lines',
-        name='International Stocks',
-        line=dict(color='rgb(44, 160, 44)', width=2)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=growth_data['Year'],
-        y=growth_data['Bonds'],
-        mode='lines',
-        name='Bonds',
-        line=dict(color='rgb(214, 39, 40)', width=2)
-    ))
+    # Create line chart of growth, one trace per series from the long-form data
+    growth_series = {
+        'Total Balance': 'Total Portfolio',
+        'US Stocks': 'US Stocks',
+        'International Stocks': 'International Stocks',
+        'Bonds': 'Bonds'
+    }
+    growth_long = growth_data.rename(columns=growth_series).melt(
+        id_vars='Year',
+        value_vars=list(growth_series.values()),
+        var_name='Series',
+        value_name='Value'
+    )
+    fig = px.line(
+        growth_long,
+        x='Year',
+        y='Value',
+        color='Series',
+        color_discrete_map={
+            'Total Portfolio': 'rgb(31, 119, 180)',
+            'US Stocks': 'rgb(255, 127, 14)',
+            'International Stocks': 'rgb(44, 160, 44)',
+            'Bonds': 'rgb(214, 39, 40)'
+        }
+    )
+    fig.update_traces(line_width=2)
+    fig.update_traces(line_width=4, selector=dict(name='Total Portfolio'))
     
     # Update layout
     fig.update_layout(
@@ -158,6 +176,7 @@ def show_compound_growth_page(portfolio):
         xaxis_title='Years',
         yaxis_title='Value ($)',
         hovermode='x unified',
+        legend_title_text=None,
         legend=dict(
             orientation="h",
             yanchor="bottom",
@@ -173,33 +192,26 @@ def show_compound_growth_page(portfolio):
     st.plotly_chart(fig, use_container_width=True)
     
     # Area chart showing contributions vs earnings
-    fig_area = go.Figure()
-    
-    fig_area.add_trace(go.Scatter(
-        x=growth_data['Year'],
-        y=growth_data['Total Contributions'],
-        mode='lines',
-        name='Contributions',
-        line=dict(width=0),
-        stackgroup='one',
-        fillcolor='rgba(44, 160, 44, 0.5)'
-    ))
-    
-    fig_area.add_trace(go.Scatter(
-        x=growth_data['Year'],
-        y=growth_data['Total Earnings'],
-        mode='lines',
-        name='Earnings',
-        line=dict(width=0),
-        stackgroup='one',
-        fillcolor='rgba(31, 119, 180, 0.5)'
-    ))
+    area_long = growth_data.rename(columns={
+        'Total Contributions': 'Contributions',
+        'Total Earnings': 'Earnings'
+    }).melt(
+        id_vars='Year',
+        value_vars=['Contributions', 'Earnings'],
+        var_name='Series',
+        value_name='Value'
+    )
+    fig_area = px.area(area_long, x='Year', y='Value', color='Series')
+    fig_area.update_traces(line_width=0)
+    fig_area.update_traces(fillcolor='rgba(44, 160, 44, 0.5)', selector=dict(name='Contributions'))
+    fig_area.update_traces(fillcolor='rgba(31, 119, 180, 0.5)', selector=dict(name='Earnings'))
     
     fig_area.update_layout(
         title='Contributions vs. Earnings Over Time',
         xaxis_title='Years',
         yaxis_title='Value ($)',
         hovermode='x unified',
+        legend_title_text=None,
         legend=dict(
             orientation="h",
             yanchor="bottom",
@@ -218,19 +230,22 @@ def show_compound_growth_page(portfolio):
     st.subheader("Growth Milestones")
     
     # Select key years to show (0, 5, 10, 15, 20, 30, 40, 50 - up to max years)
-    key_years = [0, 5, 10, 15, 20, 30, 40, 50]
-    key_years = [year for year in key_years if year <= years_to_grow]
-    
-    # Create milestone dataframe
-    milestones = growth_data[growth_data['Year'].isin(key_years)].copy()
-    milestones = milestones[['Year', 'Total Balance', 'Total Contributions', 'Total Earnings']]
-    
-    # Format the currency columns
-    milestones['Total Balance'] = milestones['Total Balance'].map('${:,.0f}'.format)
-    milestones['Total Contributions'] = milestones['Total Contributions'].map('${:,.0f}'.format)
-    milestones['Total Earnings'] = milestones['Total Earnings'].map('${:,.0f}'.format)
-    
-    st.dataframe(milestones, use_container_width=True)
+    key_years = np.array([0, 5, 10, 15, 20, 30, 40, 50])
+    key_years = key_years[key_years <= years_to_grow]
+    
+    # Create milestone dataframe, filtering rows and projecting columns in one step
+    mask = np.isin(growth_data['Year'].to_numpy(), key_years)
+    milestones = growth_data.loc[mask, ['Year', 'Total Balance', 'Total Contributions', 'Total Earnings']]
+    
+    # Format the currency columns at render time, keeping them numeric
+    st.dataframe(
+        milestones.style.format({
+            'Total Balance': '${:,.0f}',
+            'Total Contributions': '${:,.0f}',
+            'Total Earnings': '${:,.0f}'
+        }),
+        use_container_width=True
+    )
     
     # Fee impact section
     st.divider()
@@ -256,10 +271,14 @@ def show_compound_growth_page(portfolio):
         )
     
     # Calculate fee impact
-    fee_impact = calculate_fee_impact(portfolio, compare_expense)
-    
-    # Plot fee impact
-    fig_fee = go.Figure()
+    fee_impact = _cached_fee_impact(
+        portfolio.initial_investment,
+        portfolio.monthly_contribution,
+        portfolio.years_to_grow,
+        portfolio.get_weighted_return(),
+        portfolio.get_weighted_expense_ratio(),
+        compare_expense
+    )
     
     # Get column names that contain "Balance (Expense Ratio:"
     balance_cols = [col for col in fee_impact.columns if 'Balance (Expense Ratio:' in col]
@@ -269,23 +288,27 @@ def show_compound_growth_page(portfolio):
         # Sort by expense ratio (higher first)
         balance_cols = sorted(balance_cols, reverse=True)
         
-        # Add current expense ratio line (higher expense ratio)
-        fig_fee.add_trace(go.Scatter(
-            x=fee_impact['Year'],
-            y=fee_impact[balance_cols[0]],
-            mode='lines',
-            name=f'Current Expense Ratio',
-            line=dict(color='rgb(31, 119, 180)', width=3)
-        ))
-        
-        # Add comparison expense ratio line (lower expense ratio)
-        fig_fee.add_trace(go.Scatter(
-            x=fee_impact['Year'],
-            y=fee_impact[balance_cols[1]],
-            mode='lines',
-            name=f'Lower Expense Ratio',
-            line=dict(color='rgb(44, 160, 44)', width=3)
-        ))
+        # Plot current (higher) and comparison (lower) expense ratio lines
+        fee_long = fee_impact.rename(columns={
+            balance_cols[0]: 'Current Expense Ratio',
+            balance_cols[1]: 'Lower Expense Ratio'
+        }).melt(
+            id_vars='Year',
+            value_vars=['Current Expense Ratio', 'Lower Expense Ratio'],
+            var_name='Series',
+            value_name='Value'
+        )
+        fig_fee = px.line(
+            fee_long,
+            x='Year',
+            y='Value',
+            color='Series',
+            color_discrete_map={
+                'Current Expense Ratio': 'rgb(31, 119, 180)',
+                'Lower Expense Ratio': 'rgb(44, 160, 44)'
+            }
+        )
+        fig_fee.update_traces(line_width=3)
     else:
         # Fallback if columns aren't found
         st.warning("Unable to display expense ratio comparison chart. Please adjust your settings.")
@@ -297,6 +320,7 @@ def show_compound_growth_page(portfolio):
         xaxis_title='Years',
         yaxis_title='Value ($)',
         hovermode='x unified',
+        legend_title_text=None,
         legend=dict(
             orientation="h",
             yanchor="bottom",
@@ -1,9 +1,143 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from data.fund_data import get_fund_data
 
+# Static educational copy, kept at module level so it is not rebuilt on every rerun
+_EXPENSE_RATIO_MD = """
+### Why Expense Ratios Matter
+
+Expense ratios represent the annual fee that funds charge their shareholders. It's expressed as a percentage of assets under management.
+
+#### Impact on Long-Term Returns
+
+Even small differences in expense ratios can have a significant impact on your investment returns over time due to compounding:
+
+- A 0.1% difference in expense ratio on a $100,000 investment over 30 years could mean approximately $30,000 in lost returns.
+- Lower expense ratios mean more of your money stays invested and working for you.
+
+#### Expense Ratio Considerations
+
+- **Index funds** typically have much lower expense ratios than actively managed funds.
+- **ETFs** often have lower expense ratios than mutual funds with similar investment objectives.
+- Some brokerages offer proprietary funds with zero or near-zero expense ratios.
+- Consider expense ratios alongside other factors like tracking error and tax efficiency.
+
+Following the Bogleheads philosophy, keeping costs low is one of the most reliable ways to improve your investment returns over time.
+
+> *"Time is your friend; impulse is your enemy."* - Jack Bogle
+
+> *"Stay the course!"* - Jack Bogle
+"""
+
+def _reuse_figure(name, signature, build, *args):
+    """
+    Return the figure stored in session state for this chart, rebuilding it
+    only when its inputs (the signature) have changed since the last rerun
+    """
+    signature_key = f"fig_{name}_sig"
+    figure_key = f"fig_{name}"
+    
+    if st.session_state.get(signature_key) != signature or figure_key not in st.session_state:
+        st.session_state[figure_key] = build(*args)
+        st.session_state[signature_key] = signature
+    
+    return st.session_state[figure_key]
+
+def _build_box_figure(filtered_data):
+    """
+    Build the box plot of expense ratios by category and provider
+    """
+    fig = px.box(
+        filtered_data,
+        x='Category',
+        y='Expense Ratio',
+        color='Provider',
+        title='Expense Ratios by Fund Category and Provider',
+        points='all',
+        hover_data=['Ticker', 'Fund Name']
+    )
+    
+    # Format y-axis as percentage
+    fig.update_yaxes(tickformat='.3%')
+    
+    return fig
+
+def _build_bar_figure(type_data, fund_type):
+    """
+    Build the bar chart comparing expense ratios within one fund category
+    """
+    # One bar trace per provider, carrying only the fund name as hover data
+    fig_bar = go.Figure(data=[
+        go.Bar(
+            x=provider_funds['Ticker'],
+            y=provider_funds['Expense Ratio'],
+            name=provider,
+            customdata=provider_funds[['Fund Name']].to_numpy(),
+            texttemplate='%{y:.3%}',
+            hovertemplate='%{x}<br>%{customdata[0]}<br>%{y:.3%}<extra>%{fullData.name}</extra>'
+        )
+        for provider, provider_funds in type_data.groupby('Provider', observed=True, sort=False)
+    ])
+    
+    # Format y-axis as percentage
+    fig_bar.update_yaxes(tickformat='.3%')
+    
+    # Update layout
+    fig_bar.update_layout(
+        title=f'Expense Ratio Comparison for {fund_type} Funds',
+        xaxis_title='Fund Ticker',
+        yaxis_title='Expense Ratio',
+        legend_title_text='Provider'
+    )
+    
+    return fig_bar
+
+def _build_cost_figure(funds_to_compare, investment_amount, comparison_years):
+    """
+    Build the cumulative cost comparison chart for the selected funds
+    """
+    years = np.arange(comparison_years + 1)
+    rates = funds_to_compare['Expense Ratio'].to_numpy()
+    
+    # The cost in year k is investment * rate * k, so the cumulative cost
+    # after n years is investment * rate * n * (n + 1) / 2 - computed for
+    # every fund and year at once as a (funds x years) matrix
+    cost_matrix = investment_amount * rates[:, None] * years[None, :] * (years[None, :] + 1) / 2
+    
+    # Long-form frame with one row per fund and year
+    labels = [f"{ticker} ({rate:.3%})" for ticker, rate in zip(funds_to_compare['Ticker'], rates)]
+    df_cost = (
+        pd.DataFrame(cost_matrix, index=pd.Index(labels, name='Fund'), columns=years)
+        .reset_index()
+        .melt(id_vars='Fund', var_name='Year', value_name='Cumulative Cost')
+    )
+    
+    # One Plotly Express call builds every fund's line
+    fig_cost = px.line(
+        df_cost,
+        x='Year',
+        y='Cumulative Cost',
+        color='Fund',
+        markers=True
+    )
+    fig_cost.update_traces(hovertemplate='Year: %{x}<br>Cumulative Cost: $%{y:,.2f}')
+    
+    # Update layout
+    fig_cost.update_layout(
+        title=f'Cumulative Cost Comparison for ${investment_amount:,} Investment',
+        xaxis_title='Years',
+        yaxis_title='Cumulative Cost ($)',
+        hovermode='x unified'
+    )
+    
+    # Format y-axis as currency
+    fig_cost.update_yaxes(tickprefix='$', tickformat=',.0f')
+    
+    return fig_cost
+
 def show_fund_comparison_page():
     """
     Display the fund comparison page
@@ -18,7 +152,7 @@ def show_fund_comparison_page():
     
     with col1:
         # Filter by category
-        categories = sorted(fund_data['Category'].unique())
+        categories = fund_data['Category'].cat.categories.tolist()
         selected_categories = st.multiselect(
             "Filter by Fund Category",
             options=categories,
@@ -27,37 +161,31 @@ def show_fund_comparison_page():
     
     with col2:
         # Filter by provider
-        providers = sorted(fund_data['Provider'].unique())
+        providers = fund_data['Provider'].cat.categories.tolist()
         selected_providers = st.multiselect(
             "Filter by Provider",
             options=providers,
             default=providers
         )
     
-    # Apply filters
-    if selected_categories and selected_providers:
-        filtered_data = fund_data[
-            fund_data['Category'].isin(selected_categories) &
-            fund_data['Provider'].isin(selected_providers)
-        ]
-    elif selected_categories:
-        filtered_data = fund_data[fund_data['Category'].isin(selected_categories)]
-    elif selected_providers:
-        filtered_data = fund_data[fund_data['Provider'].isin(selected_providers)]
-    else:
-        filtered_data = fund_data
+    # Apply filters (an empty selection means no filtering on that column)
+    mask = np.ones(len(fund_data), dtype=bool)
+    if selected_categories:
+        mask &= fund_data['Category'].isin(selected_categories).to_numpy()
+    if selected_providers:
+        mask &= fund_data['Provider'].isin(selected_providers).to_numpy()
+    filtered_data = fund_data[mask]
     
     # Display filtered data
     if not filtered_data.empty:
         # Sort by expense ratio
         filtered_data = filtered_data.sort_values('Expense Ratio')
         
-        # Format expense ratio for display
-        display_data = filtered_data.copy()
-        display_data['Expense Ratio'] = display_data['Expense Ratio'].apply(lambda x: f"{x:.4%}")
-        
+        # Format the numeric expense ratio with a Styler instead of
+        # materializing a string column
         st.dataframe(
-            display_data[['Ticker', 'Fund Name', 'Provider', 'Category', 'Expense Ratio']],
+            filtered_data[['Ticker', 'Fund Name', 'Provider', 'Category', 'Expense Ratio']]
+                .style.format({'Expense Ratio': '{:.4%}'}),
             use_container_width=True
         )
         
@@ -65,20 +193,10 @@ def show_fund_comparison_page():
         st.subheader("Expense Ratio Comparison")
         
         # Group by category and provider for box plot
-        fig = px.box(
-            filtered_data,
-            x='Category',
-            y='Expense Ratio',
-            color='Provider',
-            title='Expense Ratios by Fund Category and Provider',
-            points='all',
-            hover_data=['Ticker', 'Fund Name']
-        )
+        filter_signature = (tuple(selected_categories), tuple(selected_providers))
+        fig = _reuse_figure("box", filter_signature, _build_box_figure, filtered_data)
         
-        # Format y-axis as percentage
-        fig.update_yaxes(tickformat='.3%')
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, key="fund_box_chart")
         
         # Bar chart comparing expense ratios directly
         st.subheader("Fund Expense Ratio Comparison")
@@ -89,31 +207,17 @@ def show_fund_comparison_page():
             options=selected_categories if selected_categories else categories
         )
         
-        # Filter by selected fund type
-        type_data = filtered_data[filtered_data['Category'] == fund_type].copy()
-        type_data = type_data.sort_values('Expense Ratio')
+        # Filter by selected fund type (filtered_data is already sorted by
+        # expense ratio and a boolean slice preserves that order)
+        type_mask = (filtered_data['Category'] == fund_type).to_numpy()
+        type_data = filtered_data.loc[type_mask]
         
         # Create bar chart
-        fig_bar = px.bar(
-            type_data,
-            x='Ticker',
-            y='Expense Ratio',
-            color='Provider',
-            title=f'Expense Ratio Comparison for {fund_type} Funds',
-            hover_data=['Fund Name'],
-            text_auto='.3%'
+        fig_bar = _reuse_figure(
+            "bar", (filter_signature, fund_type), _build_bar_figure, type_data, fund_type
         )
         
-        # Format y-axis as percentage
-        fig_bar.update_yaxes(tickformat='.3%')
-        
-        # Update layout
-        fig_bar.update_layout(
-            xaxis_title='Fund Ticker',
-            yaxis_title='Expense Ratio'
-        )
-        
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(fig_bar, use_container_width=True, key="fund_bar_chart")
         
         # Cost comparison over time
         st.subheader("Cost Comparison Over Time")
@@ -138,10 +242,11 @@ def show_fund_comparison_page():
             )
         
         # Allow selection of funds to compare
+        type_tickers = type_data['Ticker'].tolist()
         selected_funds = st.multiselect(
             "Select Funds to Compare",
-            options=type_data['Ticker'].tolist(),
-            default=type_data['Ticker'].tolist()[:3] if len(type_data) >= 3 else type_data['Ticker'].tolist()
+            options=type_tickers,
+            default=type_tickers[:3]
         )
         
         if selected_funds:
@@ -149,72 +254,18 @@ def show_fund_comparison_page():
             funds_to_compare = type_data[type_data['Ticker'].isin(selected_funds)]
             
             # Create comparison chart
-            fig_cost = go.Figure()
-            
-            for _, fund in funds_to_compare.iterrows():
-                # Calculate cost over years
-                years = list(range(comparison_years + 1))
-                costs = [investment_amount * fund['Expense Ratio'] * year for year in years]
-                cumulative_costs = [sum(costs[:i+1]) for i in range(len(costs))]
-                
-                # Add line to chart
-                fig_cost.add_trace(go.Scatter(
-                    x=years,
-                    y=cumulative_costs,
-                    mode='lines+markers',
-                    name=f"{fund['Ticker']} ({fund['Expense Ratio']:.3%})",
-                    hovertemplate='Year: %{x}<br>Cumulative Cost: $%{y:,.2f}'
-                ))
-            
-            # Update layout
-            fig_cost.update_layout(
-                title=f'Cumulative Cost Comparison for ${investment_amount:,} Investment',
-                xaxis_title='Years',
-                yaxis_title='Cumulative Cost ($)',
-                hovermode='x unified'
+            cost_signature = (tuple(selected_funds), investment_amount, comparison_years)
+            fig_cost = _reuse_figure(
+                "cost", cost_signature, _build_cost_figure,
+                funds_to_compare, investment_amount, comparison_years
             )
             
-            # Format y-axis as currency
-            fig_cost.update_yaxes(tickprefix='$', tickformat=',.0f')
-            
-            st.plotly_chart(fig_cost, use_container_width=True)
-            
-            # Calculate final cost difference but don't display the problematic text
-            if len(selected_funds) > 1:
-                final_costs = {}
-                
-                for _, fund in funds_to_compare.iterrows():
-                    final_cost = investment_amount * fund['Expense Ratio'] * comparison_years
-                    final_costs[fund['Ticker']] = final_cost
+            st.plotly_chart(fig_cost, use_container_width=True, key="fund_cost_chart")
     else:
         st.warning("No funds match the selected filters. Please adjust your criteria.")
     
-    # Educational section on expense ratios
+    # Educational section on expense ratios, collapsed by default
     st.divider()
-    st.subheader("Understanding Expense Ratios")
-    
-    st.markdown("""
-    ### Why Expense Ratios Matter
-    
-    Expense ratios represent the annual fee that funds charge their shareholders. It's expressed as a percentage of assets under management.
-    
-    #### Impact on Long-Term Returns
-    
-    Even small differences in expense ratios can have a significant impact on your investment returns over time due to compounding:
-    
-    - A 0.1% difference in expense ratio on a $100,000 investment over 30 years could mean approximately $30,000 in lost returns.
-    - Lower expense ratios mean more of your money stays invested and working for you.
-    
-    #### Expense Ratio Considerations
-    
-    - **Index funds** typically have much lower expense ratios than actively managed funds.
-    - **ETFs** often have lower expense ratios than mutual funds with similar investment objectives.
-    - Some brokerages offer proprietary funds with zero or near-zero expense ratios.
-    - Consider expense ratios alongside other factors like tracking error and tax efficiency.
-    
-    Following the Bogleheads philosophy, keeping costs low is one of the most reliable ways to improve your investment returns over time.
-    
-    > *"Time is your friend; impulse is your enemy."* - Jack Bogle
-    
-    > *"Stay the course!"* - Jack Bogle
-    """)
+    with st.expander("Understanding Expense Ratios", expanded=False):
+        st.markdown(_EXPENSE_RATIO_MD)
+
@@ -4,6 +4,21 @@ import numpy as np
 import plotly.graph_objects as go
 from utils.monte_carlo import run_monte_carlo_simulation, generate_monte_carlo_plot, calculate_success_rates, calculate_retirement_readiness
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def _run_mc(initial_investment, monthly_contribution, years, expected_return, volatility, simulations):
+    """
+    Run the Monte Carlo simulation, memoized on its scalar inputs so repeat
+    runs with unchanged parameters skip the simulation entirely
+    """
+    return run_monte_carlo_simulation(
+        initial_investment=initial_investment,
+        monthly_contribution=monthly_contribution,
+        years=years,
+        expected_return=expected_return,
+        volatility=volatility,
+        simulations=simulations
+    )
+
 def show_monte_carlo_page(portfolio):
     """
     Display the Monte Carlo simulation page for retirement planning
@@ -86,13 +101,13 @@ def show_monte_carlo_page(portfolio):
     if st.button("Run Monte Carlo Simulation"):
         with st.spinner("Running simulations..."):
             # Run the Monte Carlo simulation
-            simulation_results = run_monte_carlo_simulation(
-                initial_investment=initial_investment,
-                monthly_contribution=monthly_contribution,
-                years=years_to_simulate,
-                expected_return=expected_return,
-                volatility=volatility,
-                simulations=num_simulations
+            simulation_results = _run_mc(
+                initial_investment,
+                monthly_contribution,
+                years_to_simulate,
+                expected_return,
+                volatility,
+                num_simulations
             )
             
             # Store in session state for reference
@@ -101,10 +116,18 @@ def show_monte_carlo_page(portfolio):
         # Show simulation results
         st.subheader("Portfolio Value Projections")
         
+        # Figures are kept in session state and only rebuilt when the
+        # simulation inputs differ from the ones they were built for
+        mc_signature = (initial_investment, monthly_contribution, years_to_simulate,
+                        expected_return, volatility, num_simulations)
+        rebuild_figures = st.session_state.get("mc_fig_sig") != mc_signature
+        st.session_state.mc_fig_sig = mc_signature
+        
         # Generate and display the Monte Carlo plot
-        scenario_name = f"{years_to_simulate}-Year Projection (Return: {expected_return:.1%}, Volatility: {volatility:.1%})"
-        mc_fig = generate_monte_carlo_plot(simulation_results, scenario_name)
-        st.plotly_chart(mc_fig, use_container_width=True)
+        if rebuild_figures or "mc_fig" not in st.session_state:
+            scenario_name = f"{years_to_simulate}-Year Projection (Return: {expected_return:.1%}, Volatility: {volatility:.1%})"
+            st.session_state.mc_fig = generate_monte_carlo_plot(simulation_results, scenario_name)
+        st.plotly_chart(st.session_state.mc_fig, use_container_width=True, key="mc_chart")
         
         # Display statistics
         st.subheader("Simulation Statistics")
@@ -140,28 +163,30 @@ def show_monte_carlo_page(portfolio):
         # Target probabilities
         st.subheader("Probability of Reaching Targets")
         
-        targets = stats["target_probabilities"]
-        target_data = {
-            "Target Amount": list(targets.keys()),
-            "Probability (%)": list(targets.values())
-        }
-        target_df = pd.DataFrame(target_data)
-        
-        # Create bar chart for target probabilities
-        fig_targets = go.Figure(go.Bar(
-            x=target_df["Target Amount"],
-            y=target_df["Probability (%)"],
-            marker_color='rgb(26, 118, 255)'
-        ))
-        
-        fig_targets.update_layout(
-            title="Probability of Reaching Various Portfolio Targets",
-            xaxis_title="Target Portfolio Value",
-            yaxis_title="Probability (%)",
-            yaxis=dict(range=[0, 100])
-        )
+        if rebuild_figures or "mc_targets_fig" not in st.session_state:
+            target_df = (
+                pd.Series(stats["target_probabilities"])
+                .rename_axis("Target Amount")
+                .reset_index(name="Probability (%)")
+            )
+            
+            # Create bar chart for target probabilities
+            fig_targets = go.Figure(go.Bar(
+                x=target_df["Target Amount"],
+                y=target_df["Probability (%)"],
+                marker_color='rgb(26, 118, 255)'
+            ))
+            
+            fig_targets.update_layout(
+                title="Probability of Reaching Various Portfolio Targets",
+                xaxis_title="Target Portfolio Value",
+                yaxis_title="Probability (%)",
+                yaxis=dict(range=[0, 100])
+            )
+            
+            st.session_state.mc_targets_fig = fig_targets
         
-        st.plotly_chart(fig_targets, use_container_width=True)
+        st.plotly_chart(st.session_state.mc_targets_fig, use_container_width=True, key="mc_targets_chart")
         
         # Retirement income section
         st.subheader("Estimated Monthly Retirement Income")
@@ -171,19 +196,21 @@ def show_monte_carlo_page(portfolio):
         then adjust that amount for inflation each year without running out of money over a 30-year retirement.
         """)
         
-        # Create a dataframe for the monthly income data
-        income_data = []
-        for rate, values in stats["monthly_income"].items():
-            income_data.append({
-                "Withdrawal Rate": rate,
-                "Median Monthly Income": f"${values['Median']:,.0f}",
-                "Mean Monthly Income": f"${values['Mean']:,.0f}",
-                "Low (5th percentile)": f"${values['Low (5th percentile)']:,.0f}",
-                "High (95th percentile)": f"${values['High (95th percentile)']:,.0f}"
-            })
+        # Create a dataframe for the monthly income data, one row per withdrawal rate
+        income_df = (
+            pd.DataFrame.from_dict(stats["monthly_income"], orient='index')
+            .rename(columns={"Median": "Median Monthly Income", "Mean": "Mean Monthly Income"})
+            .rename_axis("Withdrawal Rate")
+            .reset_index()
+        )
         
-        income_df = pd.DataFrame(income_data)
-        st.dataframe(income_df, hide_index=True, use_container_width=True)
+        # Format the income columns for display without touching the numbers
+        income_columns = income_df.columns.drop("Withdrawal Rate")
+        st.dataframe(
+            income_df.style.format('${:,.0f}', subset=income_columns),
+            hide_index=True,
+            use_container_width=True
+        )
         
         # Retirement readiness calculator
         st.subheader("Retirement Readiness Calculator")
@@ -269,13 +296,9 @@ def show_monte_carlo_page(portfolio):
         
         # Create percentage of median income values
         median_income = readiness['monthly_income_projections']['Median']
-        withdrawal_amounts = [
-            median_income * 0.5,   # 50% of median income
-            median_income * 0.75,  # 75% of median income
-            median_income,         # 100% of median income
-            median_income * 1.25,  # 125% of median income
-            median_income * 1.5    # 150% of median income
-        ]
+        # 50%, 75%, 100%, 125% and 150% of median income
+        withdrawal_factors = np.array([0.5, 0.75, 1.0, 1.25, 1.5])
+        withdrawal_amounts = median_income * withdrawal_factors
         
         # Calculate success rates
         success_df = calculate_success_rates(simulation_results, withdrawal_amounts)
@@ -1,9 +1,45 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
+import plotly.graph_objects as go
 from utils.tax_efficiency import TaxEfficiencyCalculator
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_recommendations(portfolio_key, _portfolio):
+    """
+    Generate fund placement recommendations, memoized on the portfolio fields
+    they depend on (the portfolio object itself is not hashed)
+    """
+    return TaxEfficiencyCalculator().generate_recommendations(_portfolio)
+
+def _build_placement_figure(recommendations):
+    """
+    Build the stacked bar chart of recommended fund placement by account
+    """
+    # One stacked bar trace per fund type
+    fig = go.Figure(data=[
+        go.Bar(
+            x=placements['Account'],
+            y=placements['Percent of Portfolio'],
+            name=fund_type,
+            text=placements['Fund'],
+            customdata=placements[['Amount']].to_numpy(),
+            hovertemplate='Account=%{x}<br>Percent of Portfolio=%{y}<br>Fund=%{text}<br>Amount=%{customdata[0]:$,.0f}<extra>%{fullData.name}</extra>'
+        )
+        for fund_type, placements in recommendations.groupby('Fund Type', sort=False)
+    ])
+    
+    # Update layout
+    fig.update_layout(
+        title='Tax-Efficient Fund Placement',
+        xaxis_title='Account Type',
+        yaxis_title='Allocation (%)',
+        legend_title_text='Fund Type',
+        barmode='stack'
+    )
+    
+    return fig
+
 def show_tax_efficiency_page(portfolio):
     """
     Display the tax efficiency page
@@ -16,50 +52,43 @@ def show_tax_efficiency_page(portfolio):
     # Account overview
     st.subheader("Current Account Values")
     
-    # Show account values in a table
-    account_df = pd.DataFrame({
-        'Account Type': list(portfolio.account_values.keys()),
-        'Value ($)': list(portfolio.account_values.values())
-    })
-    
-    # Check if we have any account values
+    # Check if we have any account values before building the table
     if sum(portfolio.account_values.values()) > 0:
+        # Show account values in a table, with Arrow-backed columns that
+        # Streamlit can serialize without another conversion (pandas infers
+        # integer or floating point values from the inputs)
+        account_df = pd.DataFrame({
+            'Account Type': pd.array(list(portfolio.account_values.keys()), dtype='string[pyarrow]'),
+            'Value ($)': pd.Series(list(portfolio.account_values.values())).convert_dtypes(dtype_backend='pyarrow')
+        })
         st.dataframe(account_df, use_container_width=True)
         
         # Generate tax-efficient recommendations
-        recommendations = tax_calculator.generate_recommendations(portfolio)
+        portfolio_key = (
+            (portfolio.us_stock_fund, portfolio.international_stock_fund, portfolio.bond_fund),
+            (portfolio.us_stock_allocation, portfolio.international_stock_allocation, portfolio.bond_allocation),
+            tuple(portfolio.account_values.items())
+        )
+        recommendations = _cached_recommendations(portfolio_key, portfolio)
         
         if not recommendations.empty:
             st.subheader("Recommended Fund Placement")
             
-            # Format the amount column
-            recommendations['Amount'] = recommendations['Amount'].map('${:,.0f}'.format)
-            
-            # Display recommendations
+            # Display recommendations, formatting the numeric amount column at render time
             st.dataframe(
-                recommendations[['Fund', 'Fund Type', 'Account', 'Amount', 'Percent of Portfolio']],
+                recommendations[['Fund', 'Fund Type', 'Account', 'Amount', 'Percent of Portfolio']]
+                    .style.format({'Amount': '${:,.0f}', 'Percent of Portfolio': '{:.2f}'}),
                 use_container_width=True
             )
             
-            # Create a visualization of the recommendations
-            fig = px.bar(
-                recommendations,
-                x='Account',
-                y='Percent of Portfolio',
-                color='Fund Type',
-                title='Tax-Efficient Fund Placement',
-                text='Fund',
-                hover_data=['Amount']
-            )
-            
-            # Update layout
-            fig.update_layout(
-                xaxis_title='Account Type',
-                yaxis_title='Allocation (%)',
-                barmode='stack'
-            )
+            # Create a visualization of the recommendations, reusing the last
+            # figure while the portfolio inputs are unchanged
+            if st.session_state.get("tax_fig_sig") != portfolio_key or "tax_fig" not in st.session_state:
+                st.session_state.tax_fig = _build_placement_figure(recommendations)
+                st.session_state.tax_fig_sig = portfolio_key
+            fig = st.session_state.tax_fig
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, key="tax_placement_chart")
         else:
             st.warning("Unable to generate recommendations. Please ensure you have funds and accounts configured.")
     else:
@@ -72,9 +101,11 @@ def show_tax_efficiency_page(portfolio):
     # Get tax efficiency explanation
     explanation = tax_calculator.get_tax_efficiency_explanation()
     
-    for item in explanation["explanations"]:
-        st.markdown(f"#### {item['principle']}")
-        st.markdown(item['description'])
+    # Render all principles as a single markdown element
+    st.markdown("\n\n".join(
+        f"#### {item['principle']}\n\n{item['description']}"
+        for item in explanation["explanations"]
+    ))
     
     # Detailed tax-efficiency explanation
     st.divider()
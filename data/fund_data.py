@@ -1,7 +1,10 @@
+import zlib
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import streamlit as st
 
+# The fund table is static, so build it once and hand each caller its own copy
+@st.cache_data(show_spinner=False)
 def get_fund_data():
     """
     Return a DataFrame of fund data including tickers, expense ratios, and categories
@@ -140,6 +143,14 @@ def get_fund_data():
     # Create DataFrame
     df = pd.DataFrame(data)
     
+    # Low-cardinality text columns are stored as categoricals so that
+    # filters compare integer codes instead of Python strings
+    df['Category'] = df['Category'].astype('category')
+    df['Provider'] = df['Provider'].astype('category')
+    
+    # Expense ratios only need a few significant digits
+    df['Expense Ratio'] = df['Expense Ratio'].astype('float32')
+    
     return df
 
 def get_fund_alternatives(fund_type):
@@ -152,8 +163,41 @@ def get_fund_alternatives(fund_type):
     Returns:
     - DataFrame of funds matching the type
     """
+    alternatives, no_alternatives = _alternatives_by_category()
+    
+    # Hand back a copy so callers cannot modify the shared slices
+    return alternatives.get(fund_type, no_alternatives).copy()
+
+@st.cache_resource(show_spinner=False)
+def _alternatives_by_category():
+    """
+    Split the fund table by category once, each slice sorted by expense ratio
+    """
+    df = get_fund_data()
+    alternatives = {
+        category: funds
+        for category, funds in df.sort_values('Expense Ratio').groupby('Category', observed=True, sort=False)
+    }
+    return alternatives, df.iloc[:0]
+
+@st.cache_resource(show_spinner=False)
+def get_fund_index():
+    """
+    Get a lookup of fund details by ticker
+    
+    Returns:
+    - Dictionary mapping each ticker to its 'Fund Name', 'Expense Ratio' and
+      'Category' (shared between callers, so treat it as read-only)
+    """
     df = get_fund_data()
-    return df[df['Category'] == fund_type].sort_values('Expense Ratio')
+    
+    # The table stores expense ratios as float32; rounding when widening
+    # recovers the exact table values (0.0003 rather than 0.00030000001)
+    expense_ratios = df['Expense Ratio'].to_numpy(dtype=np.float64).round(6)
+    return {
+        ticker: {'Fund Name': name, 'Expense Ratio': float(expense_ratio), 'Category': category}
+        for ticker, name, expense_ratio, category in zip(df['Ticker'], df['Fund Name'], expense_ratios, df['Category'])
+    }
 
 def get_historical_prices(tickers, years=5):
     """
@@ -166,29 +210,43 @@ def get_historical_prices(tickers, years=5):
     Returns:
     - DataFrame with historical price data
     """
+    # Generate (and cache) prices for every fund in the table once per
+    # period and day, then slice out the requested columns. Always generating
+    # the whole table keeps each fund's series the same whichever funds are
+    # requested, and makes any selection a cache hit after the first call.
+    all_tickers = tuple(get_fund_data()['Ticker'])
+    as_of = pd.Timestamp.today().normalize()
+    price_data = _generate_historical_prices(all_tickers, years, as_of)
+    
+    # Keep the caller's column order, dropping duplicates and unknown tickers
+    tickers = list(dict.fromkeys(tickers))
+    return price_data[['Date'] + [t for t in tickers if t in price_data.columns]]
+
+# The end date is part of the key, so a new day produces a fresh series
+@st.cache_data(max_entries=32, show_spinner=False)
+def _generate_historical_prices(tickers, years, as_of):
+    """
+    Generate the price history for a tuple of tickers, ending at the month
+    end on or before the as_of date
+    """
     # Get fund information
     fund_data = get_fund_data()
     
     # Generate dates (monthly data points)
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=365 * years)
-    dates = pd.date_range(start=start_date, end=end_date, freq='ME')  # Month End frequency
-    
-    # Create a DataFrame to store results
-    price_data = pd.DataFrame({'Date': dates})
+    dates = pd.date_range(end=as_of, periods=years * 12, freq='ME')  # Month End frequency
     
     # Base market data - we'll simulate market movements first
     # This ensures that funds in similar categories move together
     # and respond to the same market events
     
     # Generate base market movements (S&P 500 proxy)
-    np.random.seed(42)  # For reproducibility
+    rng = np.random.default_rng(42)  # Local generator for reproducibility
     market_monthly_return = 0.007  # ~8.7% annual return
     market_monthly_vol = 0.04      # ~14% annual volatility
     
-    # Generate random market returns
+    # Generate random market returns (float32 is ample for simulated prices)
     n_months = len(dates)
-    market_random_returns = np.random.normal(market_monthly_return, market_monthly_vol, n_months)
+    market_random_returns = market_monthly_return + market_monthly_vol * rng.standard_normal(n_months, dtype=np.float32)
     
     # Add in a few market shocks (crashes and recoveries)
     # Simulate 2 significant events over the period
@@ -203,122 +261,77 @@ def get_historical_prices(tickers, years=5):
         shock_idx2 = 2 * n_months // 3
         market_random_returns[shock_idx2:shock_idx2+3] = 0.04
     
-    # Calculate cumulative market returns
-    market_cumulative = (1 + market_random_returns).cumprod()
-    
     # Define accurate base performance characteristics for different categories
-    # with realistic correlations to the overall market
-    category_params = {
-        'US Total Market': {
-            'correlation': 0.98,  # Very high correlation with market
-            'beta': 1.0,         # Same as market
-            'alpha': 0.0002,     # Small positive alpha
-            'tracking_error': 0.002,  # Very low tracking error
-            'start_price': 250   # Reasonable starting price
-        },
-        'US Large Cap': {
-            'correlation': 0.99,  # Almost perfect correlation with market
-            'beta': 0.98,        # Slightly less volatile than market
-            'alpha': 0.0001,     # Tiny positive alpha
-            'tracking_error': 0.001,  # Very low tracking error
-            'start_price': 480   # Higher price point
-        },
-        'International Developed': {
-            'correlation': 0.85,  # High but not perfect correlation
-            'beta': 1.05,        # Slightly more volatile
-            'alpha': -0.0005,    # Slight negative alpha
-            'tracking_error': 0.008,  # Higher tracking error
-            'start_price': 75    # Lower typical price
-        },
-        'International Emerging': {
-            'correlation': 0.7,   # Moderate correlation
-            'beta': 1.2,         # Higher volatility
-            'alpha': 0.0008,     # Potential for higher returns
-            'tracking_error': 0.015,  # Higher tracking error
-            'start_price': 55    # Lower typical price
-        },
-        'US Total Bond': {
-            'correlation': -0.2,  # Negative correlation with stocks
-            'beta': 0.2,         # Much lower volatility
-            'alpha': 0.0001,     # Small positive alpha
-            'tracking_error': 0.002,  # Very low tracking error
-            'start_price': 110   # Bond fund prices are typically more stable
-        },
-        'US Treasury': {
-            'correlation': -0.3,  # Stronger negative correlation
-            'beta': 0.15,        # Very low volatility
-            'alpha': 0.0,        # No alpha
-            'tracking_error': 0.001,  # Very low tracking error
-            'start_price': 115   # Government bond funds are stable
-        },
-        'REITs': {
-            'correlation': 0.6,   # Moderate correlation
-            'beta': 1.1,         # Higher volatility
-            'alpha': 0.0007,     # Potential for higher returns
-            'tracking_error': 0.01,   # Higher tracking error
-            'start_price': 120   # REIT prices
-        }
-    }
+    # with realistic correlations to the overall market, stored as parallel
+    # arrays indexed by category
+    category_names = [
+        'US Total Market',
+        'US Large Cap',
+        'International Developed',
+        'International Emerging',
+        'US Total Bond',
+        'US Treasury',
+        'REITs'
+    ]
+    # Correlation with the overall market (bonds are negatively correlated)
+    correlations = np.array([0.98, 0.99, 0.85, 0.7, -0.2, -0.3, 0.6], dtype=np.float32)
+    # Volatility relative to the market
+    betas = np.array([1.0, 0.98, 1.05, 1.2, 0.2, 0.15, 1.1], dtype=np.float32)
+    # Monthly excess return over the market
+    alphas = np.array([0.0002, 0.0001, -0.0005, 0.0008, 0.0001, 0.0, 0.0007], dtype=np.float32)
+    # Monthly category-specific volatility
+    tracking_errors = np.array([0.002, 0.001, 0.008, 0.015, 0.002, 0.001, 0.01], dtype=np.float32)
+    # Reasonable starting price for each category
+    start_prices = np.array([250, 480, 75, 55, 110, 115, 120], dtype=np.float32)
+    
+    # Generate category-level price data for all categories at once as a
+    # (categories x months) matrix
+    # Generate correlated returns with the market
+    category_specific = rng.standard_normal((len(category_names), n_months), dtype=np.float32) * tracking_errors[:, None]
+    
+    # Calculate returns based on market returns, beta, alpha and specific returns
+    category_returns = alphas[:, None] + betas[:, None] * market_random_returns[None, :] + category_specific
     
-    # Dictionary to store generated category data
-    category_data = {}
+    # Calculate prices from cumulative returns
+    category_matrix = start_prices[:, None] * (1 + category_returns).cumprod(axis=1)
     
-    # Generate category-level price data first
-    for category, params in category_params.items():
-        # Generate correlated returns with the market
-        category_specific = np.random.normal(0, params['tracking_error'], n_months)
+    # Map each ticker to its category row (-1 for unknown tickers or
+    # categories without simulated data)
+    fund_info = fund_data.set_index('Ticker').reindex(list(tickers))
+    category_rows = pd.Categorical(fund_info['Category'], categories=category_names).codes
+    has_category = category_rows >= 0
+    
+    fund_tickers = [ticker for ticker, keep in zip(tickers, has_category) if keep]
+    
+    # Generate price series for all funds at once as (months x funds) matrices
+    fund_prices = np.empty((len(dates), 0), dtype=np.float32)
+    if fund_tickers:
+        base_prices = category_matrix[category_rows[has_category]].T
+        expense_ratios = fund_info['Expense Ratio'].to_numpy(dtype=np.float32)[has_category]
         
-        # Calculate returns based on market returns, beta, alpha and specific returns
-        category_returns = params['alpha'] + params['beta'] * market_random_returns + category_specific
+        # Very small fund-specific variations (these are index funds after all)
+        # This represents tracking error, securities lending income differences, etc.
+        # Funds with lower expense ratios will slightly outperform over time
+        tracking_diff = 0.0005 - expense_ratios  # Better performance for lower expense ratios
         
-        # Calculate cumulative returns
-        category_cumulative = (1 + category_returns).cumprod()
+        # Generate small random tracking differences for every fund in one draw
+        fund_tracking_error = tracking_diff / n_months + 0.001 * rng.standard_normal((n_months, len(fund_tickers)), dtype=np.float32)
         
-        # Calculate prices
-        category_prices = params['start_price'] * category_cumulative
+        # Calculate fund-specific returns
+        fund_returns = np.zeros((n_months, len(fund_tickers)), dtype=np.float32)  # First month has no return
+        fund_returns[1:] = (base_prices[1:] / base_prices[:-1] - 1) + fund_tracking_error[1:]
         
-        # Store category data
-        category_data[category] = category_prices
+        # Calculate cumulative returns
+        fund_cumulative = (1 + fund_returns).cumprod(axis=0)
+        
+        # Calculate prices - start near the category price but with slight variations
+        # Use a CRC32 of the ticker for deterministic but unique behavior - unlike
+        # hash(), it does not change between Python processes
+        ticker_checksums = np.array([zlib.crc32(ticker.encode()) for ticker in fund_tickers])
+        start_variation = (1.0 + (ticker_checksums % 20 - 10) / 1000).astype(np.float32)  # ±1% variation
+        fund_prices = base_prices[0] * start_variation * fund_cumulative
     
-    # Generate price series for each ticker
-    for ticker in tickers:
-        if ticker in fund_data['Ticker'].values:
-            # Get the fund's category
-            fund_info = fund_data[fund_data['Ticker'] == ticker].iloc[0]
-            category = fund_info['Category']
-            
-            # Get expense ratio (this will affect long-term performance)
-            expense_ratio = fund_info['Expense Ratio']
-            
-            # Use the category data as a base
-            if category in category_data:
-                base_prices = category_data[category]
-                
-                # Add fund-specific variation 
-                # This represents tracking error, securities lending income differences, etc.
-                # Use hash of ticker for deterministic but unique behavior
-                np.random.seed(hash(ticker) % 10000)
-                
-                # Very small fund-specific variations (these are index funds after all)
-                # Funds with lower expense ratios will slightly outperform over time
-                tracking_diff = 0.0005 - expense_ratio  # Better performance for lower expense ratios
-                
-                # Generate small random tracking differences
-                fund_tracking_error = np.random.normal(tracking_diff/n_months, 0.001, n_months)
-                
-                # Calculate fund-specific returns
-                fund_returns = (base_prices[1:] / base_prices[:-1] - 1) + fund_tracking_error[1:]
-                fund_returns = np.insert(fund_returns, 0, 0)  # First month has no return
-                
-                # Calculate cumulative returns
-                fund_cumulative = (1 + fund_returns).cumprod()
-                
-                # Calculate prices - start near the category price but with slight variations
-                start_variation = 1.0 + (hash(ticker) % 20 - 10) / 1000  # ±1% variation
-                fund_start_price = base_prices[0] * start_variation
-                fund_prices = fund_start_price * fund_cumulative
-                
-                # Add to DataFrame
-                price_data[ticker] = fund_prices
+    # Build the result DataFrame in one shot from the price matrix
+    price_data = pd.DataFrame(fund_prices, index=dates, columns=fund_tickers).rename_axis('Date').reset_index()
     
     return price_data
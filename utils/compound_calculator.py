@@ -1,6 +1,34 @@
 import pandas as pd
 import numpy as np
 
+def _project_balances(initial_investment, monthly_contribution, months, annual_return_percents):
+    """
+    Project month-by-month balances for several annual return rates at once
+    
+    Parameters:
+    - initial_investment: Initial amount invested
+    - monthly_contribution: Monthly contribution amount, added at the start of each month
+    - months: Array of month numbers to project
+    - annual_return_percents: Sequence of expected annual return percentages
+    
+    Returns:
+    - 2-D array of balances with one row per return rate and one column per month
+    """
+    # Convert annual returns to monthly rates, one row per scenario
+    monthly_rates = ((1 + np.asarray(annual_return_percents, dtype=float) / 100) ** (1/12) - 1)[:, None]
+    
+    # Growth factor for every scenario and month in a single power call
+    growth = (1 + monthly_rates) ** months[None, :]
+    
+    # Closed-form balance: the initial investment compounds for every month,
+    # and each contribution is added at the start of a month before growth
+    # (future value of an annuity due). A zero rate reduces to the sum of
+    # contributions
+    safe_rates = np.where(monthly_rates == 0, 1.0, monthly_rates)
+    annuity = np.where(monthly_rates == 0, months[None, :], (1 + monthly_rates) * (growth - 1) / safe_rates)
+    
+    return initial_investment * growth + monthly_contribution * annuity
+
 def calculate_compound_growth(initial_investment, monthly_contribution, years, annual_return_percent):
     """
     Calculate compound growth over time
@@ -14,42 +42,23 @@ def calculate_compound_growth(initial_investment, monthly_contribution, years, a
     Returns:
     - DataFrame with growth projections by month
     """
-    # Convert annual return to monthly rate
-    monthly_rate = (1 + annual_return_percent/100) ** (1/12) - 1
-    
     # Create array of months
     months = np.arange(years * 12 + 1)
     
-    # Initialize arrays for values
-    balance = np.zeros(len(months))
-    contributions = np.zeros(len(months))
-    earnings = np.zeros(len(months))
+    # Track total contributions and project the balance
+    contributions = initial_investment + monthly_contribution * months.astype(float)
+    balance = _project_balances(initial_investment, monthly_contribution, months, [annual_return_percent])[0]
     
-    # Set initial values
-    balance[0] = initial_investment
-    contributions[0] = initial_investment
-    
-    # Calculate growth for each month
-    for i in range(1, len(months)):
-        # Previous balance plus new contribution
-        prev_balance_with_contribution = balance[i-1] + monthly_contribution
-        
-        # New balance with growth
-        balance[i] = prev_balance_with_contribution * (1 + monthly_rate)
-        
-        # Track total contributions
-        contributions[i] = contributions[i-1] + monthly_contribution
-        
-        # Calculate earnings (balance minus contributions)
-        earnings[i] = balance[i] - contributions[i]
+    # Calculate earnings (balance minus contributions)
+    earnings = balance - contributions
     
     # Create DataFrame with results
     df = pd.DataFrame({
-        'Month': months,
-        'Year': months // 12,
-        'Balance': balance,
-        'Contributions': contributions,
-        'Earnings': earnings
+        'Month': months.astype(np.int32),
+        'Year': (months // 12).astype(np.int32),
+        'Balance': balance.astype(np.float32),
+        'Contributions': contributions.astype(np.float32),
+        'Earnings': earnings.astype(np.float32)
     })
     
     return df
@@ -61,75 +70,86 @@ def calculate_portfolio_growth(portfolio):
     Parameters:
     - portfolio: Portfolio object containing allocation and return expectations
     
+    Returns:
+    - DataFrame with growth projections
+    """
+    return calculate_portfolio_growth_from_scalars(
+        portfolio.initial_investment,
+        portfolio.monthly_contribution,
+        portfolio.years_to_grow,
+        portfolio.us_stock_allocation,
+        portfolio.international_stock_allocation,
+        portfolio.bond_allocation,
+        portfolio.expected_return_us,
+        portfolio.expected_return_intl,
+        portfolio.expected_return_bond
+    )
+
+def calculate_portfolio_growth_from_scalars(initial_investment, monthly_contribution, years_to_grow,
+                                            us_allocation, intl_allocation, bond_allocation,
+                                            us_return, intl_return, bond_return):
+    """
+    Calculate growth for each portfolio component and the combined total from
+    plain values, so results can be cached on hashable arguments
+    
+    Parameters:
+    - initial_investment: Initial amount invested across the portfolio
+    - monthly_contribution: Monthly contribution across the portfolio
+    - years_to_grow: Number of years to project
+    - us_allocation, intl_allocation, bond_allocation: Allocation percentages
+    - us_return, intl_return, bond_return: Expected annual return percentages
+    
     Returns:
     - DataFrame with growth projections
     """
     # Calculate weighted monthly contribution based on allocation
-    us_contribution = portfolio.monthly_contribution * (portfolio.us_stock_allocation / 100)
-    intl_contribution = portfolio.monthly_contribution * (portfolio.international_stock_allocation / 100)
-    bond_contribution = portfolio.monthly_contribution * (portfolio.bond_allocation / 100)
+    us_contribution = monthly_contribution * (us_allocation / 100)
+    intl_contribution = monthly_contribution * (intl_allocation / 100)
+    bond_contribution = monthly_contribution * (bond_allocation / 100)
     
     # Calculate initial investment for each component
-    total_investment = portfolio.initial_investment
-    us_initial = total_investment * (portfolio.us_stock_allocation / 100)
-    intl_initial = total_investment * (portfolio.international_stock_allocation / 100)
-    bond_initial = total_investment * (portfolio.bond_allocation / 100)
+    total_investment = initial_investment
+    us_initial = total_investment * (us_allocation / 100)
+    intl_initial = total_investment * (intl_allocation / 100)
+    bond_initial = total_investment * (bond_allocation / 100)
     
     # Calculate growth for each component
     us_growth = calculate_compound_growth(
         us_initial, 
         us_contribution, 
-        portfolio.years_to_grow, 
-        portfolio.expected_return_us
+        years_to_grow, 
+        us_return
     )
     
     intl_growth = calculate_compound_growth(
         intl_initial, 
         intl_contribution, 
-        portfolio.years_to_grow, 
-        portfolio.expected_return_intl
+        years_to_grow, 
+        intl_return
     )
     
     bond_growth = calculate_compound_growth(
         bond_initial, 
         bond_contribution, 
-        portfolio.years_to_grow, 
-        portfolio.expected_return_bond
+        years_to_grow, 
+        bond_return
     )
     
-    # Calculate total portfolio growth (annual data points only)
-    years = np.arange(portfolio.years_to_grow + 1)
-    
-    # Create a new DataFrame with just the years we want
-    annual_data = []
-    
-    for year in years:
-        # Get the data for this year from each component
-        us_year_data = us_growth[us_growth['Year'] == year].iloc[0] if not us_growth[us_growth['Year'] == year].empty else None
-        intl_year_data = intl_growth[intl_growth['Year'] == year].iloc[0] if not intl_growth[intl_growth['Year'] == year].empty else None
-        bond_year_data = bond_growth[bond_growth['Year'] == year].iloc[0] if not bond_growth[bond_growth['Year'] == year].empty else None
-        
-        # Make sure we have data for all components
-        if us_year_data is not None and intl_year_data is not None and bond_year_data is not None:
-            us_balance = us_year_data['Balance']
-            intl_balance = intl_year_data['Balance']
-            bond_balance = bond_year_data['Balance']
-            
-            us_contribution = us_year_data['Contributions']
-            intl_contribution = intl_year_data['Contributions']
-            bond_contribution = bond_year_data['Contributions']
-            
-            annual_data.append({
-                'Year': year,
-                'US Stocks': us_balance,
-                'International Stocks': intl_balance,
-                'Bonds': bond_balance,
-                'Total Balance': us_balance + intl_balance + bond_balance,
-                'Total Contributions': us_contribution + intl_contribution + bond_contribution
-            })
-    
-    # Create the DataFrame
-    total_growth = pd.DataFrame(annual_data)
+    # Calculate total portfolio growth (annual data points only) - the first
+    # month of each year is every 12th row of the monthly projections
+    us_annual = us_growth.iloc[::12].reset_index(drop=True)
+    intl_annual = intl_growth.iloc[::12].reset_index(drop=True)
+    bond_annual = bond_growth.iloc[::12].reset_index(drop=True)
+    
+    total_growth = pd.DataFrame({
+        'Year': us_annual['Year'],
+        'US Stocks': us_annual['Balance'],
+        'International Stocks': intl_annual['Balance'],
+        'Bonds': bond_annual['Balance']
+    })
+    total_growth['Total Balance'] = total_growth['US Stocks'] + total_growth['International Stocks'] + total_growth['Bonds']
+    total_growth['Total Contributions'] = (us_annual['Contributions'] + intl_annual['Contributions'] +
+                                           bond_annual['Contributions'])
     
     # Calculate total earnings
     total_growth['Total Earnings'] = total_growth['Total Balance'] - total_growth['Total Contributions']
@@ -147,9 +167,33 @@ def calculate_fee_impact(portfolio, alternative_expense_ratio=None):
     Returns:
     - DataFrame with comparison
     """
-    # Get current weighted expense ratio
-    current_expense_ratio = portfolio.get_weighted_expense_ratio()
+    return calculate_fee_impact_from_scalars(
+        portfolio.initial_investment,
+        portfolio.monthly_contribution,
+        portfolio.years_to_grow,
+        portfolio.get_weighted_return(),
+        portfolio.get_weighted_expense_ratio(),
+        alternative_expense_ratio
+    )
+
+def calculate_fee_impact_from_scalars(initial_investment, monthly_contribution, years_to_grow,
+                                      expected_return, current_expense_ratio,
+                                      alternative_expense_ratio=None):
+    """
+    Calculate the impact of expense ratios on long-term growth from plain
+    values, so results can be cached on hashable arguments
+    
+    Parameters:
+    - initial_investment: Initial amount invested
+    - monthly_contribution: Monthly contribution amount
+    - years_to_grow: Number of years to project
+    - expected_return: Weighted expected annual return percentage
+    - current_expense_ratio: Current weighted expense ratio (decimal)
+    - alternative_expense_ratio: Alternative expense ratio to compare against
     
+    Returns:
+    - DataFrame with comparison
+    """
     # If no alternative provided, use half the current for comparison
     if alternative_expense_ratio is None:
         alternative_expense_ratio = current_expense_ratio / 2
@@ -162,7 +206,6 @@ def calculate_fee_impact(portfolio, alternative_expense_ratio=None):
         alternative_expense_ratio = alternative_expense_ratio / 100.0  # Convert from percentage to decimal
         
     # Calculate expected return with fees (expected return is in percentage format)
-    expected_return = portfolio.get_weighted_return()
     net_return_current = expected_return - (current_expense_ratio * 100)  # Convert expense ratio to percentage
     net_return_alternative = expected_return - (alternative_expense_ratio * 100)  # Convert expense ratio to percentage
     
@@ -170,54 +213,28 @@ def calculate_fee_impact(portfolio, alternative_expense_ratio=None):
     net_return_current = max(0.1, net_return_current)
     net_return_alternative = max(0.1, net_return_alternative)
     
-    # Calculate growth with current expense ratio
-    growth_current = calculate_compound_growth(
-        portfolio.initial_investment,
-        portfolio.monthly_contribution,
-        portfolio.years_to_grow,
-        net_return_current
-    )
-    
-    # Calculate growth with alternative expense ratio
-    growth_alternative = calculate_compound_growth(
-        portfolio.initial_investment,
-        portfolio.monthly_contribution,
-        portfolio.years_to_grow,
-        net_return_alternative
-    )
-    
-    # Get annual data points only
-    years = np.arange(portfolio.years_to_grow + 1)
-    
-    # Create a new DataFrame with just the years we want
-    comparison_data = []
-    
-    for year in years:
-        # Get the data for this year from each growth calculation
-        current_year_data = growth_current[growth_current['Year'] == year].iloc[0] if not growth_current[growth_current['Year'] == year].empty else None
-        alt_year_data = growth_alternative[growth_alternative['Year'] == year].iloc[0] if not growth_alternative[growth_alternative['Year'] == year].empty else None
-        
-        # Make sure we have data for both
-        if current_year_data is not None and alt_year_data is not None:
-            current_balance = current_year_data['Balance']
-            alt_balance = alt_year_data['Balance']
-            
-            # Calculate realistic fee impact
-            fee_impact = alt_balance - current_balance
-            
-            # Ensure fee impact isn't unrealistically large (more than 20% of the current balance)
-            if fee_impact > current_balance * 0.2:
-                fee_impact = current_balance * 0.2
-                alt_balance = current_balance + fee_impact
-            
-            comparison_data.append({
-                'Year': year,
-                f'Balance (Expense Ratio: {current_expense_ratio:.3%})': current_balance,
-                f'Balance (Expense Ratio: {alternative_expense_ratio:.3%})': alt_balance,
-                'Fee Impact': fee_impact
-            })
+    # Project both expense ratio scenarios together and keep annual data
+    # points only (the first month of each year)
+    months = np.arange(years_to_grow * 12 + 1)
+    annual_balances = _project_balances(
+        initial_investment,
+        monthly_contribution,
+        months,
+        [net_return_current, net_return_alternative]
+    )[:, ::12]
+    current_balance, alt_balance = annual_balances
+    
+    # Calculate realistic fee impact, capped so it isn't unrealistically
+    # large (more than 20% of the current balance)
+    fee_impact = np.minimum(alt_balance - current_balance, current_balance * 0.2)
+    alt_balance = current_balance + fee_impact
     
     # Create comparison DataFrame
-    comparison = pd.DataFrame(comparison_data)
+    comparison = pd.DataFrame({
+        'Year': (months[::12] // 12).astype(np.int32),
+        f'Balance (Expense Ratio: {current_expense_ratio:.3%})': current_balance.astype(np.float32),
+        f'Balance (Expense Ratio: {alternative_expense_ratio:.3%})': alt_balance.astype(np.float32),
+        'Fee Impact': fee_impact.astype(np.float32)
+    })
     
     return comparison
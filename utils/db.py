@@ -1,8 +1,9 @@
 import os
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import create_engine, insert, delete, Column, Integer, String, Float, DateTime, ForeignKey, Boolean, JSON
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, selectinload
+from sqlalchemy.dialects import postgresql, sqlite
 import datetime
 
 # Create a base class for our ORM models
@@ -18,7 +19,7 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     # Relationship with the portfolios table
-    portfolios = relationship('Portfolio', back_populates='user')
+    portfolios = relationship('Portfolio', back_populates='user', cascade='all, delete-orphan', passive_deletes=True)
     
     def __repr__(self):
         return f"<User(username='{self.username}', email='{self.email}')>"
@@ -29,7 +30,7 @@ class Portfolio(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
-    user_id = Column(Integer, ForeignKey('users.id'))
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), index=True)
     initial_investment = Column(Float, default=10000)
     monthly_contribution = Column(Float, default=500)
     years_to_grow = Column(Integer, default=30)
@@ -38,8 +39,8 @@ class Portfolio(Base):
     
     # Relationships
     user = relationship('User', back_populates='portfolios')
-    allocations = relationship('Allocation', back_populates='portfolio')
-    fund_selections = relationship('FundSelection', back_populates='portfolio')
+    allocations = relationship('Allocation', back_populates='portfolio', cascade='all, delete-orphan', passive_deletes=True)
+    fund_selections = relationship('FundSelection', back_populates='portfolio', cascade='all, delete-orphan', passive_deletes=True)
     
     def __repr__(self):
         return f"<Portfolio(name='{self.name}', user_id={self.user_id})>"
@@ -49,7 +50,7 @@ class Allocation(Base):
     __tablename__ = 'allocations'
     
     id = Column(Integer, primary_key=True)
-    portfolio_id = Column(Integer, ForeignKey('portfolios.id'))
+    portfolio_id = Column(Integer, ForeignKey('portfolios.id', ondelete='CASCADE'), index=True)
     us_stock = Column(Float, default=60.0)
     international_stock = Column(Float, default=30.0)
     bond = Column(Float, default=10.0)
@@ -65,7 +66,7 @@ class FundSelection(Base):
     __tablename__ = 'fund_selections'
     
     id = Column(Integer, primary_key=True)
-    portfolio_id = Column(Integer, ForeignKey('portfolios.id'))
+    portfolio_id = Column(Integer, ForeignKey('portfolios.id', ondelete='CASCADE'), index=True)
     category = Column(String(50), nullable=False)  # 'US Stock', 'International Stock', 'Bond'
     ticker = Column(String(10), nullable=False)
     name = Column(String(100))
@@ -82,28 +83,50 @@ class SavedCalculation(Base):
     __tablename__ = 'saved_calculations'
     
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'))
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), index=True)
     name = Column(String(100), nullable=False)
     calculation_type = Column(String(50), nullable=False)  # 'compound_growth', 'fee_impact', etc.
-    params = Column(Text)  # JSON string of parameters
-    result = Column(Text)  # JSON string of results
+    params = Column(JSON().with_variant(postgresql.JSONB(), 'postgresql'))  # Parameters, stored as JSONB on PostgreSQL
+    result = Column(JSON().with_variant(postgresql.JSONB(), 'postgresql'))  # Results, stored as JSONB on PostgreSQL
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     def __repr__(self):
         return f"<SavedCalculation(name='{self.name}', calculation_type='{self.calculation_type}')>"
 
 
+# Engine and session factory, created on first use and shared by every
+# call so pooled connections are reused between requests
+_engine = None
+_session_factory = None
+
+
 # Create a database engine
 def get_engine():
-    """Get SQLAlchemy engine using the database URL from environment variables"""
-    db_url = os.environ.get('DATABASE_URL')
-    if db_url:
-        # Ensure the URL starts with postgresql:// instead of postgres://
-        if db_url.startswith('postgres://'):
-            db_url = db_url.replace('postgres://', 'postgresql://', 1)
-        return create_engine(db_url)
-    else:
-        raise EnvironmentError("DATABASE_URL environment variable not set")
+    """Get the shared SQLAlchemy engine using the database URL from environment variables"""
+    global _engine
+    if _engine is None:
+        db_url = os.environ.get('DATABASE_URL')
+        if db_url:
+            # Ensure the URL starts with postgresql:// instead of postgres://
+            if db_url.startswith('postgres://'):
+                db_url = db_url.replace('postgres://', 'postgresql://', 1)
+            # Check pooled connections before use and recycle them before
+            # the server drops idle ones
+            engine_options = dict(pool_pre_ping=True, pool_recycle=300)
+            if db_url.startswith('postgresql'):
+                # Size the pool for a small app, reuse the most recently
+                # returned (warmest) connection first and fail fast when the
+                # server is unreachable
+                engine_options.update(
+                    pool_size=8,
+                    max_overflow=4,
+                    pool_use_lifo=True,
+                    connect_args={'connect_timeout': 5, 'application_name': 'boglefolio'}
+                )
+            _engine = create_engine(db_url, **engine_options)
+        else:
+            raise EnvironmentError("DATABASE_URL environment variable not set")
+    return _engine
 
 
 def init_db():
@@ -114,100 +137,129 @@ def init_db():
 
 
 def get_session():
-    """Get a database session"""
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    """Get a database session from the shared session factory"""
+    global _session_factory
+    if _session_factory is None:
+        # Keep attributes loaded after commit so returned objects can be
+        # read without another SELECT once the session is closed
+        _session_factory = sessionmaker(bind=get_engine(), expire_on_commit=False)
+    return _session_factory()
+
+
+def _ensure_user(session, user_id):
+    """
+    Create the user row for user_id unless it already exists
+    
+    Uses a single INSERT ... ON CONFLICT DO NOTHING where the database
+    supports it, which also avoids a race between concurrent saves
+    
+    Args:
+        session: Active database session
+        user_id: User ID to ensure
+    """
+    user_values = dict(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com")
+    dialect_inserts = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+    dialect_insert = dialect_inserts.get(session.get_bind().dialect.name)
+    
+    if dialect_insert is not None:
+        session.execute(dialect_insert(User).values(**user_values).on_conflict_do_nothing(index_elements=['id']))
+    elif session.get(User, user_id) is None:
+        session.add(User(**user_values))
 
 
 # Portfolio CRUD operations
-def save_portfolio(portfolio_obj, user_id=1):
+def save_portfolio(portfolio_obj, user_id=1, fund_index=None):
     """
     Save a portfolio object to the database
     
     Args:
         portfolio_obj: A Portfolio object from utils/portfolio.py
         user_id: User ID (default: 1 for single-user mode)
+        fund_index: Optional mapping of ticker to a dict with 'Fund Name' and
+            'Expense Ratio', used to fill in the fund selections
         
     Returns:
         Portfolio: Database portfolio object
     """
-    session = get_session()
+    return save_portfolios([portfolio_obj], user_id, fund_index)[0]
+
+
+def save_portfolios(portfolio_objs, user_id=1, fund_index=None):
+    """
+    Save several portfolio objects to the database in one transaction
     
-    try:
-        # Check if user exists, create if not
-        user = session.query(User).filter_by(id=user_id).first()
-        if not user:
-            user = User(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com")
-            session.add(user)
-        
-        # Convert portfolio object to database model
-        portfolio_data = portfolio_obj.to_dict()
-        
-        # Create portfolio with proper field mapping
-        db_portfolio = Portfolio(
-            name=portfolio_data.get('name', 'My Portfolio'),
-            user_id=user_id,
-            initial_investment=portfolio_data.get('initial_investment', 10000),
-            monthly_contribution=portfolio_data.get('monthly_contribution', 500),
-            years_to_grow=portfolio_data.get('years_to_grow', 30)
-        )
-        session.add(db_portfolio)
-        session.flush()  # Get the ID
-        
-        # Create allocation
-        allocation = Allocation(
-            portfolio_id=db_portfolio.id,
-            us_stock=portfolio_data.get('us_stock_allocation', 60),
-            international_stock=portfolio_data.get('international_stock_allocation', 30),
-            bond=portfolio_data.get('bond_allocation', 10)
-        )
-        session.add(allocation)
-        
-        # Add fund selections
-        # Create fund selection for US Stock
-        us_stock_fund = FundSelection(
-            portfolio_id=db_portfolio.id,
-            category='US Stock',
-            ticker=portfolio_data.get('us_stock_fund', 'VTI'),
-            name='',  # Will be filled later
-            expense_ratio=0.0  # Will be filled later
-        )
-        session.add(us_stock_fund)
-        
-        # Create fund selection for International Stock
-        intl_stock_fund = FundSelection(
-            portfolio_id=db_portfolio.id,
-            category='International Stock',
-            ticker=portfolio_data.get('international_stock_fund', 'VXUS'),
-            name='',  # Will be filled later
-            expense_ratio=0.0  # Will be filled later
-        )
-        session.add(intl_stock_fund)
+    Each table gets a single batched INSERT however many portfolios are
+    saved, so bulk imports cost a handful of statements rather than several
+    per portfolio
+    
+    Args:
+        portfolio_objs: List of Portfolio objects from utils/portfolio.py
+        user_id: User ID (default: 1 for single-user mode)
+        fund_index: Optional mapping of ticker to a dict with 'Fund Name' and
+            'Expense Ratio', used to fill in the fund selections
         
-        # Create fund selection for Bond
-        bond_fund = FundSelection(
-            portfolio_id=db_portfolio.id,
-            category='Bond',
-            ticker=portfolio_data.get('bond_fund', 'BND'),
-            name='',  # Will be filled later
-            expense_ratio=0.0  # Will be filled later
-        )
-        session.add(bond_fund)
+    Returns:
+        list: Database portfolio objects, in the same order as portfolio_objs
+    """
+    # Convert portfolio objects to plain data
+    portfolios_data = [portfolio_obj.to_dict() for portfolio_obj in portfolio_objs]
+    if not portfolios_data:
+        return []
+    
+    with get_session() as session, session.begin():
+        # Create the user if it does not exist yet
+        _ensure_user(session, user_id)
         
-        # Commit changes to database
-        session.commit()
+        # Create portfolios with proper field mapping, getting the new rows
+        # (and their IDs) back from INSERT ... RETURNING in input order
+        db_portfolios = session.scalars(
+            insert(Portfolio).returning(Portfolio, sort_by_parameter_order=True),
+            [
+                {
+                    'name': portfolio_data.get('name', 'My Portfolio'),
+                    'user_id': user_id,
+                    'initial_investment': portfolio_data.get('initial_investment', 10000),
+                    'monthly_contribution': portfolio_data.get('monthly_contribution', 500),
+                    'years_to_grow': portfolio_data.get('years_to_grow', 30)
+                }
+                for portfolio_data in portfolios_data
+            ]
+        ).all()
         
-        # Detach the portfolio object from the session to avoid errors
-        session.expunge(db_portfolio)
+        # Create allocations
+        session.execute(insert(Allocation), [
+            {
+                'portfolio_id': db_portfolio.id,
+                'us_stock': portfolio_data.get('us_stock_allocation', 60),
+                'international_stock': portfolio_data.get('international_stock_allocation', 30),
+                'bond': portfolio_data.get('bond_allocation', 10)
+            }
+            for db_portfolio, portfolio_data in zip(db_portfolios, portfolios_data)
+        ])
         
-        return db_portfolio
+        # Add fund selections for US Stock, International Stock and Bond
+        # in one multi-row INSERT, with names and expense ratios taken from
+        # the ticker index when one is given
+        fund_index = fund_index or {}
+        session.execute(insert(FundSelection), [
+            {
+                'portfolio_id': db_portfolio.id,
+                'category': category,
+                'ticker': ticker,
+                'name': fund_index.get(ticker, {}).get('Fund Name', ''),
+                'expense_ratio': fund_index.get(ticker, {}).get('Expense Ratio', 0.0)
+            }
+            for db_portfolio, portfolio_data in zip(db_portfolios, portfolios_data)
+            for category, ticker in [
+                ('US Stock', portfolio_data.get('us_stock_fund', 'VTI')),
+                ('International Stock', portfolio_data.get('international_stock_fund', 'VXUS')),
+                ('Bond', portfolio_data.get('bond_fund', 'BND'))
+            ]
+        ])
         
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
+    # Changes are committed when the transaction block exits, and the
+    # portfolios stay readable after the session closes
+    return db_portfolios
 
 
 def load_portfolio(portfolio_id, user_id=1):
@@ -221,19 +273,22 @@ def load_portfolio(portfolio_id, user_id=1):
     Returns:
         dict: Portfolio data in a format compatible with utils/portfolio.py
     """
-    session = get_session()
-    
-    try:
-        # Get portfolio
-        db_portfolio = session.query(Portfolio).filter_by(id=portfolio_id, user_id=user_id).first()
+    with get_session() as session:
+        # Get portfolio, eagerly loading its allocation and fund selections
+        db_portfolio = (
+            session.query(Portfolio)
+            .options(selectinload(Portfolio.allocations), selectinload(Portfolio.fund_selections))
+            .filter_by(id=portfolio_id, user_id=user_id)
+            .first()
+        )
         if not db_portfolio:
             return None
         
         # Get allocation
-        allocation = session.query(Allocation).filter_by(portfolio_id=portfolio_id).first()
+        allocation = db_portfolio.allocations[0] if db_portfolio.allocations else None
         
         # Get fund selections
-        fund_selections = session.query(FundSelection).filter_by(portfolio_id=portfolio_id).all()
+        fund_selections = db_portfolio.fund_selections
         
         # Convert to dict format for Portfolio class
         portfolio_data = {
@@ -256,12 +311,6 @@ def load_portfolio(portfolio_id, user_id=1):
             }
         
         return portfolio_data
-        
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
 
 def get_user_portfolios(user_id=1):
@@ -274,16 +323,9 @@ def get_user_portfolios(user_id=1):
     Returns:
         list: List of portfolio dicts with id and name
     """
-    session = get_session()
-    
-    try:
+    with get_session() as session:
         portfolios = session.query(Portfolio).filter_by(user_id=user_id).all()
         return [{'id': p.id, 'name': p.name} for p in portfolios]
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
 
 def delete_portfolio(portfolio_id, user_id=1):
@@ -297,18 +339,14 @@ def delete_portfolio(portfolio_id, user_id=1):
     Returns:
         bool: Success flag
     """
-    session = get_session()
-    
-    try:
+    with get_session() as session, session.begin():
         portfolio = session.query(Portfolio).filter_by(id=portfolio_id, user_id=user_id).first()
         if portfolio:
-            # Delete related allocations and fund selections (cascade)
+            # Delete related allocations and fund selections with one
+            # statement each. The foreign keys cascade on delete, but tables
+            # created before they did still need the children removed first
+            session.execute(delete(Allocation).where(Allocation.portfolio_id == portfolio.id))
+            session.execute(delete(FundSelection).where(FundSelection.portfolio_id == portfolio.id))
             session.delete(portfolio)
-            session.commit()
             return True
         return False
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
\ No newline at end of file
@@ -8,7 +8,8 @@ from scipy.stats import norm
 
 def run_monte_carlo_simulation(initial_investment, monthly_contribution, years, 
                                expected_return, volatility, simulations=1000, 
-                               confidence_intervals=[0.05, 0.25, 0.5, 0.75, 0.95]):
+                               confidence_intervals=[0.05, 0.25, 0.5, 0.75, 0.95],
+                               seed=None):
     """
     Run a Monte Carlo simulation for retirement planning
     
@@ -20,10 +21,40 @@ def run_monte_carlo_simulation(initial_investment, monthly_contribution, years,
     - volatility: Annual volatility/standard deviation (decimal)
     - simulations: Number of simulation paths to generate
     - confidence_intervals: List of confidence intervals to calculate
+    - seed: Seed (or SeedSequence) for the random generator, None for fresh entropy
     
     Returns:
     - Dictionary containing simulation results
     """
+    simulation_results = simulate_portfolio_paths(
+        initial_investment, monthly_contribution, years,
+        expected_return, volatility, simulations, seed
+    )
+    
+    return summarize_simulation(simulation_results, initial_investment, years, confidence_intervals)
+
+def simulate_portfolio_paths(initial_investment, monthly_contribution, years, 
+                             expected_return, volatility, simulations=1000, seed=None):
+    """
+    Generate the simulated portfolio value paths
+    
+    Each call draws from its own random generator, so batches with independent
+    seeds can be generated in separate processes and concatenated afterwards
+    
+    Parameters:
+    - initial_investment: Initial portfolio value
+    - monthly_contribution: Monthly contribution amount
+    - years: Number of years to simulate
+    - expected_return: Annual expected return (decimal)
+    - volatility: Annual volatility/standard deviation (decimal)
+    - simulations: Number of simulation paths to generate
+    - seed: Seed (or SeedSequence) for the random generator, None for fresh entropy
+    
+    Returns:
+    - float32 array of portfolio values with shape (months + 1, simulations)
+    """
+    rng = np.random.default_rng(seed)
+    
     # Convert annual figures to monthly
     monthly_return = expected_return / 12
     monthly_volatility = volatility / np.sqrt(12)
@@ -32,31 +63,42 @@ def run_monte_carlo_simulation(initial_investment, monthly_contribution, years,
     months = years * 12
     
     # Initialize array for simulation results
-    simulation_results = np.zeros((months + 1, simulations))
+    simulation_results = np.empty((months + 1, simulations), dtype=np.float32)
     
     # Set initial investment for all simulations
     simulation_results[0, :] = initial_investment
     
-    # Run simulations
-    for sim in range(simulations):
-        # Generate random monthly returns
-        random_returns = np.random.normal(monthly_return, monthly_volatility, months)
+    # Generate all random monthly returns in one draw. Drawing one row of
+    # months per simulation keeps the same random stream as generating each
+    # path separately; transpose to (months, simulations)
+    random_returns = rng.normal(monthly_return, monthly_volatility, (simulations, months)).astype(np.float32).T
+    
+    # Calculate cumulative portfolio value for every simulation at once
+    for month in range(1, months + 1):
+        # Current month's growth
+        simulation_results[month] = simulation_results[month - 1] * (1 + random_returns[month - 1])
         
-        # Calculate cumulative portfolio value
-        for month in range(1, months + 1):
-            # Previous month's value
-            prev_value = simulation_results[month - 1, sim]
-            
-            # Current month's growth
-            growth = prev_value * (1 + random_returns[month - 1])
-            
-            # Add monthly contribution
-            if month < months:  # Only add contributions before the final month
-                current_value = growth + monthly_contribution
-            else:
-                current_value = growth
-                
-            simulation_results[month, sim] = current_value
+        # Add monthly contribution
+        if month < months:  # Only add contributions before the final month
+            simulation_results[month] += monthly_contribution
+    
+    return simulation_results
+
+def summarize_simulation(simulation_results, initial_investment, years, 
+                         confidence_intervals=[0.05, 0.25, 0.5, 0.75, 0.95]):
+    """
+    Compute statistics for a matrix of simulated portfolio paths
+    
+    Parameters:
+    - simulation_results: Array of portfolio values with shape (months + 1, simulations)
+    - initial_investment: Initial portfolio value
+    - years: Number of years simulated
+    - confidence_intervals: List of confidence intervals to calculate
+    
+    Returns:
+    - Dictionary containing simulation results
+    """
+    months = years * 12
     
     # Create time points (in years)
     time_points = np.linspace(0, years, months + 1)
@@ -65,20 +107,19 @@ def run_monte_carlo_simulation(initial_investment, monthly_contribution, years,
     median_values = np.median(simulation_results, axis=1)
     mean_values = np.mean(simulation_results, axis=1)
     
-    # Calculate percentiles for confidence intervals
-    percentiles = {}
-    for ci in confidence_intervals:
-        percentiles[ci] = np.percentile(simulation_results, ci * 100, axis=1)
+    # Calculate percentiles for all confidence intervals in a single pass
+    quantiles = np.quantile(simulation_results, np.asarray(confidence_intervals), axis=1).astype(simulation_results.dtype, copy=False)
+    percentiles = dict(zip(confidence_intervals, quantiles))
     
-    # Final portfolio value statistics
+    # Final portfolio value statistics, read off the sorted final values
     final_values = simulation_results[-1, :]
+    sorted_final = np.sort(final_values)
     final_mean = np.mean(final_values)
-    final_median = np.median(final_values)
-    final_min = np.min(final_values)
-    final_max = np.max(final_values)
+    final_median = np.median(sorted_final)
+    final_min = sorted_final[0]
+    final_max = sorted_final[-1]
     
     # Calculate probability of reaching various targets
-    targets = {}
     target_amounts = [
         initial_investment * 2,  # Double initial investment
         initial_investment * 5,  # 5x initial investment
@@ -87,9 +128,10 @@ def run_monte_carlo_simulation(initial_investment, monthly_contribution, years,
         5000000   # $5 million
     ]
     
-    for target in target_amounts:
-        probability = np.mean(final_values >= target) * 100
-        targets[f"${target:,.0f}"] = probability
+    # The share of final values at or above each target, by binary search
+    first_reaching = np.searchsorted(sorted_final, np.asarray(target_amounts, dtype=sorted_final.dtype), side='left')
+    probabilities = (sorted_final.size - first_reaching) / sorted_final.size * 100
+    targets = {f"${target:,.0f}": probability for target, probability in zip(target_amounts, probabilities)}
     
     # Calculate safe withdrawal rates
     # Common 4% rule and some variations
@@ -111,11 +153,13 @@ def run_monte_carlo_simulation(initial_investment, monthly_contribution, years,
             "High (95th percentile)": percentiles[0.95][-1] * rate
         }
     
-    # Prepare return data
+    # Prepare return data, keeping only the final values and a sample of
+    # paths for plotting rather than the full (months + 1, simulations) matrix
     results = {
         "simulation_data": {
             "time_points": time_points,
-            "simulations": simulation_results,
+            "final_values": final_values.copy(),
+            "sample_paths": simulation_results[:, :50].copy(),
             "median": median_values,
             "mean": mean_values,
             "percentiles": percentiles
@@ -132,6 +176,17 @@ def run_monte_carlo_simulation(initial_investment, monthly_contribution, years,
     
     return results
 
+def _band_ring(lower, upper, idx):
+    """
+    Build the closed outline of a filled band: lower at idx forward, then
+    upper at idx backward, gathered straight into one preallocated array
+    """
+    n = len(idx)
+    ring = np.empty(2 * n, dtype=np.result_type(lower, upper))
+    np.take(lower, idx, out=ring[:n])
+    np.take(upper, idx[::-1], out=ring[n:])
+    return ring
+
 def generate_monte_carlo_plot(simulation_results, scenario_name="Default Scenario"):
     """
     Generate an interactive Plotly plot from Monte Carlo simulation results
@@ -146,29 +201,35 @@ def generate_monte_carlo_plot(simulation_results, scenario_name="Default Scenari
     sim_data = simulation_results["simulation_data"]
     time_points = sim_data["time_points"]
     
-    fig = go.Figure()
+    # Collect every trace first and build the figure in one go
+    traces = []
     
     # Add a sample of individual simulation paths (max 50 for performance)
-    num_sims = min(50, sim_data["simulations"].shape[1])
-    for i in range(num_sims):
-        show_legend = True if i == 0 else False
-        fig.add_trace(go.Scatter(
-            x=time_points,
-            y=sim_data["simulations"][:, i],
-            mode='lines',
-            line=dict(color='rgba(100, 100, 100, 0.1)'),
-            name='Simulation Paths',
-            showlegend=show_legend,
-            hoverinfo='skip'
-        ))
-    
-    # Add percentile ranges
+    # as a single WebGL trace, with a NaN gap separating consecutive paths
+    sample_paths = sim_data["sample_paths"]
+    num_sims = sample_paths.shape[1]
+    gap = np.full((1, num_sims), np.nan)
+    traces.append(go.Scattergl(
+        x=np.tile(np.append(time_points, np.nan), num_sims),
+        y=np.vstack([sample_paths, gap]).T.ravel(),
+        mode='lines',
+        line=dict(color='rgba(100, 100, 100, 0.1)'),
+        name='Simulation Paths',
+        showlegend=True,
+        hoverinfo='skip'
+    ))
+    
+    # Add percentile ranges, downsampled to about 120 points (always keeping
+    # the final month) since the filled bands are smooth
     percentiles = sim_data["percentiles"]
+    stride = max(1, len(time_points) // 120)
+    band_idx = np.unique(np.append(np.arange(0, len(time_points), stride), len(time_points) - 1))
+    band_x = _band_ring(time_points, time_points, band_idx)
     
     # 5th to 95th percentile range (90% confidence interval)
-    fig.add_trace(go.Scatter(
-        x=np.concatenate([time_points, time_points[::-1]]),
-        y=np.concatenate([percentiles[0.05], percentiles[0.95][::-1]]),
+    traces.append(go.Scatter(
+        x=band_x,
+        y=_band_ring(percentiles[0.05], percentiles[0.95], band_idx),
         fill='toself',
         fillcolor='rgba(0, 100, 80, 0.2)',
         line=dict(color='rgba(0, 100, 80, 0)'),
@@ -177,9 +238,9 @@ def generate_monte_carlo_plot(simulation_results, scenario_name="Default Scenari
     ))
     
     # 25th to 75th percentile range (50% confidence interval)
-    fig.add_trace(go.Scatter(
-        x=np.concatenate([time_points, time_points[::-1]]),
-        y=np.concatenate([percentiles[0.25], percentiles[0.75][::-1]]),
+    traces.append(go.Scatter(
+        x=band_x,
+        y=_band_ring(percentiles[0.25], percentiles[0.75], band_idx),
         fill='toself',
         fillcolor='rgba(0, 100, 80, 0.4)',
         line=dict(color='rgba(0, 100, 80, 0)'),
@@ -188,7 +249,7 @@ def generate_monte_carlo_plot(simulation_results, scenario_name="Default Scenari
     ))
     
     # Add median line
-    fig.add_trace(go.Scatter(
+    traces.append(go.Scatter(
         x=time_points,
         y=sim_data["median"],
         mode='lines',
@@ -198,7 +259,7 @@ def generate_monte_carlo_plot(simulation_results, scenario_name="Default Scenari
     ))
     
     # Add mean line
-    fig.add_trace(go.Scatter(
+    traces.append(go.Scatter(
         x=time_points,
         y=sim_data["mean"],
         mode='lines',
@@ -207,24 +268,24 @@ def generate_monte_carlo_plot(simulation_results, scenario_name="Default Scenari
         showlegend=True
     ))
     
-    # Update layout
-    fig.update_layout(
-        title=f'Monte Carlo Simulation: {scenario_name}',
-        xaxis_title='Years',
-        yaxis_title='Portfolio Value ($)',
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
+    # Build the figure with its layout, including the currency y-axis format
+    fig = go.Figure(
+        data=traces,
+        layout=dict(
+            title=f'Monte Carlo Simulation: {scenario_name}',
+            xaxis_title='Years',
+            yaxis=dict(title='Portfolio Value ($)', tickprefix='$', tickformat=',.0f'),
+            hovermode='x unified',
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
         )
     )
     
-    # Format y-axis as currency
-    fig.update_yaxes(tickprefix='$', tickformat=',.0f')
-    
     return fig
 
 def calculate_success_rates(simulation_results, withdrawal_amounts):
@@ -233,30 +294,28 @@ def calculate_success_rates(simulation_results, withdrawal_amounts):
     
     Parameters:
     - simulation_results: Results from run_monte_carlo_simulation
-    - withdrawal_amounts: List of monthly withdrawal amounts to test
+    - withdrawal_amounts: List or array of monthly withdrawal amounts to test
     
     Returns:
     - DataFrame with success rates
     """
-    final_values = simulation_results["simulation_data"]["simulations"][-1, :]
-    
-    success_rates = []
-    for amount in withdrawal_amounts:
-        # Calculate required principal for this withdrawal using the 4% rule
-        # (Monthly withdrawal × 12 months) / 0.04 = required principal
-        required_principal = (amount * 12) / 0.04
-        
-        # Calculate percentage of simulations where final value exceeds required amount
-        success_rate = np.mean(final_values >= required_principal) * 100
-        
-        success_rates.append({
-            'Monthly Withdrawal': amount,
-            'Annual Withdrawal': amount * 12,
-            'Required Principal (4% Rule)': required_principal,
-            'Success Rate (%)': success_rate
-        })
-    
-    return pd.DataFrame(success_rates)
+    final_values = simulation_results["simulation_data"]["final_values"]
+    amounts = np.asarray(withdrawal_amounts, dtype=float)
+    
+    # Calculate required principal for each withdrawal using the 4% rule
+    # (Monthly withdrawal × 12 months) / 0.04 = required principal
+    required_principals = (amounts * 12) / 0.04
+    
+    # Percentage of simulations where final value exceeds each required amount,
+    # compared for all amounts at once as an (amounts x simulations) grid
+    success = (final_values[None, :] >= required_principals[:, None]).mean(axis=1) * 100
+    
+    return pd.DataFrame({
+        'Monthly Withdrawal': amounts,
+        'Annual Withdrawal': amounts * 12,
+        'Required Principal (4% Rule)': required_principals,
+        'Success Rate (%)': success
+    })
 
 def calculate_retirement_readiness(target_monthly_income, simulation_results, withdrawal_rate=0.04):
     """
@@ -274,7 +333,7 @@ def calculate_retirement_readiness(target_monthly_income, simulation_results, wi
     required_principal = (target_monthly_income * 12) / withdrawal_rate
     
     # Get final portfolio values from simulations
-    final_values = simulation_results["simulation_data"]["simulations"][-1, :]
+    final_values = simulation_results["simulation_data"]["final_values"]
     
     # Calculate success rate
     success_rate = np.mean(final_values >= required_principal) * 100
@@ -296,11 +355,14 @@ def calculate_retirement_readiness(target_monthly_income, simulation_results, wi
     median_data = simulation_results["simulation_data"]["median"]
     time_points = simulation_results["simulation_data"]["time_points"]
     
-    # Find where median crosses the required principal threshold
-    retirement_ready_index = np.where(median_data >= required_principal)[0]
+    # Find where median first crosses the required principal threshold. The
+    # median path can dip, so it is not sorted and searchsorted would not
+    # be safe; argmax returns the first True without building an index array
+    reached = median_data >= required_principal
+    retirement_ready_index = np.argmax(reached)
     
-    if len(retirement_ready_index) > 0:
-        years_to_retirement = time_points[retirement_ready_index[0]]
+    if reached[retirement_ready_index]:
+        years_to_retirement = time_points[retirement_ready_index]
     else:
         years_to_retirement = float('inf')  # Not achieved within simulation timeframe
     
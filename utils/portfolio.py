@@ -1,9 +1,20 @@
 import pandas as pd
 import numpy as np
-from data.fund_data import get_fund_data
+from sqlalchemy.exc import SQLAlchemyError
+from data.fund_data import get_fund_index
 import utils.db as db
 
 class Portfolio:
+    __slots__ = (
+        'id', 'name',
+        'us_stock_allocation', 'international_stock_allocation', 'bond_allocation',
+        'us_stock_fund', 'international_stock_fund', 'bond_fund',
+        'account_values', 'initial_investment',
+        'monthly_contribution', 'years_to_grow',
+        'expected_return_us', 'expected_return_intl', 'expected_return_bond',
+        '_fund_index'
+    )
+    
     def __init__(self, portfolio_id=None, name="My Portfolio"):
         # Portfolio ID and name
         self.id = portfolio_id
@@ -38,7 +49,7 @@ class Portfolio:
         self.expected_return_bond = 3.0
         
         # Fund data
-        self.fund_data = get_fund_data()
+        self._fund_index = get_fund_index()
         
         # If portfolio_id is provided, load from the database
         if portfolio_id:
@@ -80,31 +91,36 @@ class Portfolio:
             ]
         }
         
+    def _allocation_vector(self):
+        """Return the allocation percentages as a US/International/Bond array"""
+        return np.array([
+            self.us_stock_allocation,
+            self.international_stock_allocation,
+            self.bond_allocation
+        ], dtype=np.float64)
+        
     def get_weighted_expense_ratio(self):
         """Calculate weighted expense ratio for the portfolio"""
-        fund_data = self.fund_data
-        
-        us_expense = fund_data[fund_data['Ticker'] == self.us_stock_fund]['Expense Ratio'].values[0]
-        intl_expense = fund_data[fund_data['Ticker'] == self.international_stock_fund]['Expense Ratio'].values[0]
-        bond_expense = fund_data[fund_data['Ticker'] == self.bond_fund]['Expense Ratio'].values[0]
-        
-        weighted_ratio = (
-            (self.us_stock_allocation / 100) * us_expense +
-            (self.international_stock_allocation / 100) * intl_expense +
-            (self.bond_allocation / 100) * bond_expense
+        # Gather all three expense ratios from the ticker index at once
+        # (0.0 for a ticker that is not in the fund table)
+        expense_ratios = np.fromiter(
+            (self.get_fund_expense_ratio(ticker)
+             for ticker in (self.us_stock_fund, self.international_stock_fund, self.bond_fund)),
+            dtype=np.float64,
+            count=3
         )
         
-        return weighted_ratio
+        return float(self._allocation_vector() @ expense_ratios) / 100
     
     def get_weighted_return(self):
         """Calculate weighted expected return for the portfolio"""
-        weighted_return = (
-            (self.us_stock_allocation / 100) * self.expected_return_us +
-            (self.international_stock_allocation / 100) * self.expected_return_intl +
-            (self.bond_allocation / 100) * self.expected_return_bond
-        )
+        expected_returns = np.array([
+            self.expected_return_us,
+            self.expected_return_intl,
+            self.expected_return_bond
+        ], dtype=np.float64)
         
-        return weighted_return
+        return float(self._allocation_vector() @ expected_returns) / 100
     
     def to_dict(self):
         """Convert portfolio to dictionary for saving"""
@@ -169,14 +185,14 @@ class Portfolio:
         """
         try:
             # Save to the database directly using the current object
-            db_portfolio = db.save_portfolio(self, user_id)
+            db_portfolio = db.save_portfolio(self, user_id, self._fund_index)
             
             # Update our ID
             if db_portfolio:
                 self.id = db_portfolio.id
                 return self.id
             return None
-        except Exception as e:
+        except (SQLAlchemyError, EnvironmentError) as e:
             import traceback
             print(f"Error saving portfolio to database: {e}")
             print(traceback.format_exc())
@@ -243,7 +259,7 @@ class Portfolio:
                 return True
             return False
             
-        except Exception as e:
+        except (SQLAlchemyError, EnvironmentError) as e:
             import traceback
             print(f"Error loading portfolio from database: {e}")
             print(traceback.format_exc())
@@ -251,15 +267,11 @@ class Portfolio:
             
     def get_fund_name(self, ticker):
         """Get the name of a fund by ticker"""
-        fund_data = self.fund_data
-        name = fund_data[fund_data['Ticker'] == ticker]['Fund Name'].values
-        return name[0] if len(name) > 0 else ""
+        return self._fund_index.get(ticker, {}).get('Fund Name', "")
         
     def get_fund_expense_ratio(self, ticker):
         """Get the expense ratio of a fund by ticker"""
-        fund_data = self.fund_data
-        expense = fund_data[fund_data['Ticker'] == ticker]['Expense Ratio'].values
-        return float(expense[0]) if len(expense) > 0 else 0.0
+        return self._fund_index.get(ticker, {}).get('Expense Ratio', 0.0)
         
     @classmethod
     def get_user_portfolios(cls, user_id=1):
@@ -274,7 +286,7 @@ class Portfolio:
         """
         try:
             return db.get_user_portfolios(user_id)
-        except Exception as e:
+        except (SQLAlchemyError, EnvironmentError) as e:
             print(f"Error getting user portfolios: {e}")
             return []
             
@@ -292,6 +304,6 @@ class Portfolio:
         """
         try:
             return db.delete_portfolio(portfolio_id, user_id)
-        except Exception as e:
+        except (SQLAlchemyError, EnvironmentError) as e:
             print(f"Error deleting portfolio: {e}")
             return False
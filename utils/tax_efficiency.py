@@ -1,120 +1,110 @@
 import pandas as pd
 import numpy as np
-from data.fund_data import get_fund_data
+from types import MappingProxyType
+from data.fund_data import get_fund_index
 
 class TaxEfficiencyCalculator:
-    def __init__(self):
-        # Tax efficiency rankings (higher means more tax-inefficient)
-        self.tax_efficiency_rankings = {
-            "US Total Market": 3,
-            "US Large Cap": 3,
-            "US Small Cap": 4,
-            "International Developed": 4,
-            "International Emerging": 5,
-            "US Total Bond": 5,
-            "US Treasury": 6,
-            "US TIPS": 6,
-            "US Corporate": 7,
-            "US High Yield": 7,
-            "International Bond": 6,
-            "REITs": 7
-        }
-        
-        # Account tax benefits rankings (higher means more tax-advantaged)
-        self.account_tax_rankings = {
-            "401k": 5,
-            "IRA": 5,
-            "HSA": 6,
-            "Taxable": 1
-        }
-        
+    __slots__ = ()
+    
+    # Tax efficiency rankings (higher means more tax-inefficient)
+    tax_efficiency_rankings = MappingProxyType({
+        "US Total Market": 3,
+        "US Large Cap": 3,
+        "US Small Cap": 4,
+        "International Developed": 4,
+        "International Emerging": 5,
+        "US Total Bond": 5,
+        "US Treasury": 6,
+        "US TIPS": 6,
+        "US Corporate": 7,
+        "US High Yield": 7,
+        "International Bond": 6,
+        "REITs": 7
+    })
+    
+    # Account tax benefits rankings (higher means more tax-advantaged)
+    account_tax_rankings = MappingProxyType({
+        "401k": 5,
+        "IRA": 5,
+        "HSA": 6,
+        "Taxable": 1
+    })
+    
     def get_fund_tax_efficiency(self, fund_ticker):
         """Get the tax efficiency ranking for a specific fund"""
-        fund_data = get_fund_data()
-        fund_info = fund_data[fund_data['Ticker'] == fund_ticker]
+        fund_info = get_fund_index().get(fund_ticker)
         
-        if not fund_info.empty:
-            fund_category = fund_info['Category'].values[0]
-            return self.tax_efficiency_rankings.get(fund_category, 3)
+        if fund_info is not None:
+            return self.tax_efficiency_rankings.get(fund_info['Category'], 3)
         
         return 3  # Default ranking if fund not found
     
     def generate_recommendations(self, portfolio):
         """Generate tax-efficient fund placement recommendations"""
-        # Get tax efficiency values for the selected funds
-        us_tax_efficiency = self.get_fund_tax_efficiency(portfolio.us_stock_fund)
-        intl_tax_efficiency = self.get_fund_tax_efficiency(portfolio.international_stock_fund)
-        bond_tax_efficiency = self.get_fund_tax_efficiency(portfolio.bond_fund)
+        # Fund information as parallel arrays
+        funds = [portfolio.us_stock_fund, portfolio.international_stock_fund, portfolio.bond_fund]
+        fund_types = ['US Stocks', 'International Stocks', 'Bonds']
+        allocations = np.array([
+            portfolio.us_stock_allocation, 
+            portfolio.international_stock_allocation, 
+            portfolio.bond_allocation
+        ], dtype=np.float64)
         
-        # Create a DataFrame of fund information
-        funds_df = pd.DataFrame({
-            'Fund': [portfolio.us_stock_fund, portfolio.international_stock_fund, portfolio.bond_fund],
-            'Type': ['US Stocks', 'International Stocks', 'Bonds'],
-            'Allocation': [
-                portfolio.us_stock_allocation, 
-                portfolio.international_stock_allocation, 
-                portfolio.bond_allocation
-            ],
-            'Tax Inefficiency': [us_tax_efficiency, intl_tax_efficiency, bond_tax_efficiency]
-        })
+        # Get tax efficiency values for the selected funds in one pass over
+        # the ticker index (default ranking if a fund is not found)
+        fund_index = get_fund_index()
+        tax_inefficiency = np.array([
+            self.tax_efficiency_rankings.get(fund_index.get(ticker, {}).get('Category'), 3)
+            for ticker in funds
+        ])
         
         # Sort funds by tax inefficiency (most tax-inefficient first)
-        funds_df = funds_df.sort_values('Tax Inefficiency', ascending=False)
-        
-        # Create a DataFrame of accounts with their values and tax advantages
-        accounts_df = pd.DataFrame({
-            'Account': list(portfolio.account_values.keys()),
-            'Value': list(portfolio.account_values.values()),
-            'Tax Advantage': [self.account_tax_rankings.get(acct, 1) for acct in portfolio.account_values.keys()]
-        })
+        fund_order = np.argsort(-tax_inefficiency, kind='stable')
         
-        # Sort accounts by tax advantage (highest tax advantage first)
-        accounts_df = accounts_df.sort_values('Tax Advantage', ascending=False)
+        # Account information, sorted by tax advantage (highest tax advantage first)
+        account_items = list(portfolio.account_values.items())
+        accounts = [acct for acct, _ in account_items]
+        account_values = np.fromiter((value for _, value in account_items), dtype=np.float64, count=len(account_items))
+        tax_advantage = np.fromiter(
+            (self.account_tax_rankings.get(acct, 1) for acct in accounts), dtype=np.int8, count=len(accounts)
+        )
+        account_order = np.argsort(-tax_advantage, kind='stable')
         
         # Calculate dollar amounts needed for each fund
-        total_portfolio = sum(portfolio.account_values.values())
-        funds_df['Dollar Amount'] = funds_df['Allocation'] * total_portfolio / 100
+        total_portfolio = account_values.sum()
+        fund_amounts = allocations[fund_order] * total_portfolio / 100
+        account_remaining = account_values[account_order]
         
         # Create recommendations
         recommendations = []
         
-        # Copy DataFrames to avoid modifying originals
-        remaining_funds = funds_df.copy()
-        remaining_accounts = accounts_df.copy()
-        
-        # Allocate funds to accounts based on tax-efficiency
-        while not remaining_funds.empty and not remaining_accounts.empty:
-            # Get the most tax-inefficient fund and most tax-advantaged account
-            current_fund = remaining_funds.iloc[0]
-            current_account = remaining_accounts.iloc[0]
-            
-            # Determine how much of the fund to place in this account
-            amount_to_place = min(current_fund['Dollar Amount'], current_account['Value'])
+        # Allocate funds to accounts based on tax-efficiency, sweeping the
+        # sorted funds (i) and accounts (j) together
+        i = j = 0
+        while i < len(fund_amounts) and j < len(account_remaining):
+            # Determine how much of the current fund to place in the current account
+            amount_to_place = min(fund_amounts[i], account_remaining[j])
             
             # Record the recommendation
             if amount_to_place > 0:
+                fund_idx = fund_order[i]
                 recommendations.append({
-                    'Fund': current_fund['Fund'],
-                    'Fund Type': current_fund['Type'],
-                    'Account': current_account['Account'],
-                    'Amount': amount_to_place,
-                    'Percent of Portfolio': round(amount_to_place / total_portfolio * 100, 2)
+                    'Fund': funds[fund_idx],
+                    'Fund Type': fund_types[fund_idx],
+                    'Account': accounts[account_order[j]],
+                    'Amount': float(amount_to_place),
+                    'Percent of Portfolio': round(float(amount_to_place / total_portfolio * 100), 2)
                 })
             
             # Update remaining amounts
-            remaining_fund_amount = current_fund['Dollar Amount'] - amount_to_place
-            remaining_account_value = current_account['Value'] - amount_to_place
+            fund_amounts[i] -= amount_to_place
+            account_remaining[j] -= amount_to_place
             
-            # Remove fund or account if fully allocated
-            if remaining_fund_amount <= 0:
-                remaining_funds = remaining_funds.iloc[1:].copy()
-            else:
-                remaining_funds.iloc[0, remaining_funds.columns.get_loc('Dollar Amount')] = remaining_fund_amount
-                
-            if remaining_account_value <= 0:
-                remaining_accounts = remaining_accounts.iloc[1:].copy()
-            else:
-                remaining_accounts.iloc[0, remaining_accounts.columns.get_loc('Value')] = remaining_account_value
+            # Move past the fund or account if fully allocated
+            if fund_amounts[i] <= 0:
+                i += 1
+            if account_remaining[j] <= 0:
+                j += 1
         
         return pd.DataFrame(recommendations)
     